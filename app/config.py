@@ -1,11 +1,15 @@
 # app/config.py
 import os
+import copy
 import json
+import time
+import threading
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 BIN_DIR = os.path.join(BASE_DIR, "bin")
 MODELS_DIR = os.path.join(BASE_DIR, "models")
 SETTINGS_FILE = os.path.join(BASE_DIR, "settings.json")
+TRANS_CACHE_FILE = os.path.join(BASE_DIR, "translation_cache.db")
 TEMP_AUDIO = os.path.join(BASE_DIR, "temp_recording.wav")
 
 if not os.path.exists(MODELS_DIR):
@@ -20,21 +24,118 @@ DEFAULT_CONFIG = {
     "app_lang": "auto",
     "enable_steamvr": False,
 
+    # 翻译引擎: llm_remote (OpenAI 兼容 API) / ct2_local (CTranslate2 NLLB，离线)
+    "trans_engine": "llm_remote",
+    "trans_local_model": "nllb-200-distilled-600M-ct2", # models/ 下的目录名
+    "trans_local_device": "auto",
+    "trans_local_compute_type": "auto",
+    "trans_local_beam_size": 2,
+    "trans_local_cpu_threads": 0,
     "api_base": "https://api.deepseek.com",
     "api_key": "",
     "model": "deepseek-chat",
+    # 翻译 API 连接池 (keep-alive)；http2 需要额外安装 httpx[http2]
+    "http_pool_size": 4,
+    "http2": False,
+    "http_idle_reconnect_sec": 45,
+    # 流式翻译：每个语言字段生成完毕即刷新显示；osc_stream_partial 同时把中间结果发到 Chatbox
+    "trans_stream": True,
+    "osc_stream_partial": False,
+    # Chatbox 发送调度：限速间隔、单页字数上限、分页停留时间；排队消息 replace (只发最新) / merge (合并)
+    "osc_min_interval_ms": 1500,
+    "osc_chatbox_limit": 144,
+    "osc_page_interval_ms": 3000,
+    "osc_queue_policy": "replace",
+    # OSC 输出目标；format: chatbox (VRChat) / message (单条消息) / bundle，address 可含 {kind} (final / partial)
+    # 例: {"name": "OBS", "host": "192.168.1.20", "port": 9100, "format": "message", "address": "/subtitle/{kind}", "partial": true}
+    "osc_targets": [
+        {"name": "VRChat", "host": "127.0.0.1", "port": 9000, "format": "chatbox"}
+    ],
+    "trans_stream_usage": True, # 流式请求附带 stream_options.include_usage，统计 token 与前缀缓存命中
+    # 翻译记忆缓存 (内存 LRU + translation_cache.db)；默认只命中去掉标点 / 空白 / 大小写后相同的句子
+    "trans_cache": True,
+    "trans_cache_size": 512,
+    "trans_cache_fuzzy_threshold": 0, # 模糊匹配的编辑相似度阈值 0~1 (0 = 关闭)，如 0.9
+    # 数字 / 表情 / 口头语 / 已是目标语言的输入不调用 LLM，本地直接输出
+    "trans_trivial_skip": True,
+    # 新请求取消所有仍在进行的旧请求 (默认关闭：每句都翻译，结果按顺序回传)；coalesce 把仍在排队的旧原文并入新请求
+    "trans_supersede": False,
+    "trans_coalesce": False,
+    # 微批处理：LLM 忙时把窗口内到达的多句合并为一次 JSON 数组请求 (trans_supersede 开启时排队的句子会被取代，不再合并)
+    "trans_batch_window_ms": 150,
+    "trans_batch_max": 4,
+    # 备用服务商 (按顺序): [{"name", "api_base", "api_key", "model"}]；主服务商超过其 p90 耗时未返回时对冲到下一个
+    "trans_providers": [],
+    "trans_hedge_default_ms": 1500, # 延迟样本不足时的对冲等待时间
+    "trans_hedge_min_ms": 300,
+    "trans_deadline_ms": 6000, # 总截止时间，超时直接发送原文 (0 = 不限)
     
     # === STT 设置 ===
     "stt_engine": "faster_whisper",
     "whisper_model_size": "base", # [New] 新增模型大小配置
+    # Faster-Whisper 调优 ("auto" / 0 = 根据 CPU 核数、指令集与 CUDA 自动探测)
+    "whisper_device": "auto",        # auto / cpu / cuda
+    "whisper_compute_type": "auto",  # auto / int8 / int8_float16 / float16 / float32 ...
+    "whisper_cpu_threads": 0,
+    "whisper_num_workers": 1,
+    "whisper_beam_size": 0,
+    "whisper_best_of": 0,
+    # 长音频 (会议模式) 超过该时长走 VAD 切分 + 批量解码；0 = 关闭
+    "whisper_long_form_sec": 30,
+    "whisper_batch_size": 0,
+    # 单句识别的目标延迟 (ms)：按片段时长与本机实时率动态选择 beam / 温度回退 / 生成长度；0 = 关闭
+    "stt_latency_budget_ms": 800,
+    # 双通道识别：小模型先出预览并提前开始翻译，大模型给出最终文本
+    "stt_two_pass": False,
+    "stt_preview_engine": "faster_whisper",
+    "stt_preview_model_size": "tiny",
+    # 投机翻译：预览稳定度 (置信度) 与长度达到阈值才提前翻译
+    "trans_spec_min_stability": 0.4,
+    "trans_spec_min_chars": 2,
+    # 逐句语种识别："auto" = 用 Whisper detect_language 识别开头几秒；也可固定为语言代码
+    "stt_language": "auto",
+    "stt_default_language": "zh",   # 无法识别 / 置信度不足时的回退语种
+    "stt_langid_window_sec": 3,
+    "stt_langid_min_prob": 0.5,
+    "stt_langid_switch_prob": 0.8,  # 同一说话人切换语种所需的置信度 (粘滞缓存)
+    "stt_langid_sticky_sec": 30,
+    # 额外常驻引擎与语种路由，例如 {"zh": "funasr", "yue": "funasr"}
+    "stt_extra_engines": [],
+    "stt_language_routes": {"zh": "funasr", "yue": "funasr"},
+    # 置信度门控：drop = 丢弃 / flag = 只翻译展示不自动发送 / off = 关闭
+    "stt_gate_action": "drop",
+    "stt_gate_min_avg_logprob": -1.0,
+    "stt_gate_max_no_speech_prob": 0.6,
+    "stt_gate_max_compression_ratio": 2.4,
+    # 静音片段上常见的 Whisper 幻觉 (归一化后整句匹配)
+    "stt_gate_blocklist": [
+        "Thanks for watching!",
+        "Thank you for watching.",
+        "Please subscribe to my channel.",
+        "字幕由Amara.org社区提供",
+        "请不吝点赞 订阅 转发 打赏支持明镜与点点栏目",
+        "ご視聴ありがとうございました",
+        "Продолжение следует..."
+    ],
     
     "hotkey_rec": "ctrl+b",
     "hotkey_send": "ctrl+n",
+    # OSC 输入：监听 VRChat 的 OSC 输出端口，把 Avatar 参数映射为录音 / 发送
+    # action: hold (按住说话) / toggle / start / stop / send
+    "osc_input_enabled": False,
+    "osc_input_host": "127.0.0.1",
+    "osc_input_port": 9001,
+    "osc_input_bindings": [
+        {"address": "/avatar/parameters/PolyglotTalk", "action": "hold"},
+        {"address": "/avatar/parameters/PolyglotSend", "action": "send"}
+    ],
     "rec_mode": "hold",
     "mic_index": 0,
     
     "auto_send": True,
     "sound_cues": True,
+    # settings.json 写回防抖：窗口内的多次 save() 合并为一次后台写入
+    "config_save_debounce_ms": 500,
     
     # === PC 悬浮窗设置 ===
     "overlay_x": 100,
@@ -72,13 +173,28 @@ DEFAULT_CONFIG = {
     "langs": {"zh": True, "en": True, "ja": True, "ru": True, "pinyin": True}
 }
 
+# 写入失败后的重试间隔
+SAVE_RETRY_SEC = 5
+
 class ConfigManager:
+    """
+    全局配置 (单例)
+    get / set 可在任意线程调用 (列表 / 字典按副本读写，锁外的修改不会影响正在序列化的快照)；save() 只标记脏数据，由后台线程在 config_save_debounce_ms
+    防抖窗口后合并写入 (持续拖动时最迟 4 个窗口写一次)。写入先落到临时文件再 os.replace，
+    中途崩溃不会留下半截的 settings.json。退出前调用 flush()。
+    """
     _instance = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            cls._instance.data = DEFAULT_CONFIG.copy()
+            cls._instance.data = copy.deepcopy(DEFAULT_CONFIG)
+            cls._instance._lock = threading.RLock()
+            cls._instance._cond = threading.Condition(cls._instance._lock)
+            cls._instance._io_lock = threading.Lock()
+            cls._instance._dirty_since = None
+            cls._instance._due = 0.0
+            cls._instance._writer = None
             cls._instance.load()
         return cls._instance
 
@@ -87,7 +203,8 @@ class ConfigManager:
             try:
                 with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
                     saved = json.load(f)
-                    self._deep_update(self.data, saved)
+                    with self._lock:
+                        self._deep_update(self.data, saved)
             except: pass
     
     def _deep_update(self, target, source):
@@ -98,11 +215,79 @@ class ConfigManager:
                 target[k] = v
 
     def save(self):
+        """标记需要写回，立即返回"""
+        with self._cond:
+            now = time.monotonic()
+            debounce = (self.data.get("config_save_debounce_ms") or 0) / 1000
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._due = min(now + debounce, self._dirty_since + debounce * 4)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="config-writer", daemon=True)
+                self._writer.start()
+            self._cond.notify()
+
+    def flush(self):
+        """立即写入尚未落盘的修改 (退出时调用)"""
+        self._persist()
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                while self._dirty_since is None or time.monotonic() < self._due:
+                    timeout = None if self._dirty_since is None else max(0.0, self._due - time.monotonic())
+                    self._cond.wait(timeout)
+            try:
+                self._persist()
+            except Exception as e:
+                # 写线程不能退出，否则之后的 save() 都不会落盘
+                print(f"Save config failed: {e}")
+
+    def _persist(self):
+        # _io_lock 保证快照与写入顺序一致：后写入的一定是更新的快照
+        with self._io_lock:
+            with self._lock:
+                if self._dirty_since is None:
+                    return
+                dirty_since, self._dirty_since = self._dirty_since, None
+                try:
+                    text = self._dumps()
+                except Exception as e:
+                    print(f"Serialize config failed: {e}")
+                    text = None
+            if text is None or not self._write(text):
+                self._retry(dirty_since)
+
+    def _retry(self, dirty_since):
+        """写入失败：恢复脏标记，稍后由写线程重试"""
+        with self._cond:
+            if self._dirty_since is None:
+                self._dirty_since = dirty_since
+            self._due = time.monotonic() + SAVE_RETRY_SEC
+            self._cond.notify()
+
+    def _dumps(self):
+        # 调用方持有锁：序列化得到一致的快照，写文件在锁外进行
+        return json.dumps(self.data, indent=4, ensure_ascii=False)
+
+    def _write(self, text):
+        tmp = f"{SETTINGS_FILE}.tmp"
         try:
-            with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=4, ensure_ascii=False)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, SETTINGS_FILE)
+            return True
         except Exception as e:
             print(f"Save config failed: {e}")
+            return False
+
+    def get(self, key):
+        with self._lock:
+            val = self.data.get(key, DEFAULT_CONFIG.get(key))
+            return copy.deepcopy(val) if isinstance(val, (dict, list)) else val
 
-    def get(self, key): return self.data.get(key, DEFAULT_CONFIG.get(key))
-    def set(self, key, val): self.data[key] = val
\ No newline at end of file
+    def set(self, key, val):
+        with self._lock:
+            self.data[key] = copy.deepcopy(val) if isinstance(val, (dict, list)) else val
@@ -0,0 +1,99 @@
+# app/core/decode_policy.py
+import threading
+from typing import Optional
+
+# Whisper 的默认温度回退序列；预算紧张时只保留 0.0，避免失败重解码拉长尾延迟
+DEFAULT_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+# 每秒语音的 token 上限估计 (中文/英文口语都远低于此值)，用于限制生成长度
+TOKENS_PER_SEC = 15
+MIN_NEW_TOKENS = 16
+MAX_NEW_TOKENS = 448
+
+
+def beam_cost(beam_size: int) -> float:
+    """相对贪心解码的计算代价 (经验值：beam=5 约为 greedy 的 2 倍)"""
+    return 1.0 + 0.25 * (max(1, beam_size) - 1)
+
+
+class LatencyBudgetPolicy:
+    """
+    延迟预算解码策略 (位于 ISTTEngine.transcribe 之上)
+
+    维护本机实时率 (RTF) 的滑动估计，按片段时长为每次识别挑选
+    beam_size / 温度回退 / 生成长度，使预测的尾延迟落在 target_ms 之内。
+    """
+
+    def __init__(self, target_ms: float = 800, initial_rtf: float = 0.3, alpha: float = 0.2,
+                 long_form_sec: float = 0.0):
+        self.target_sec = max(0.0, target_ms / 1000.0)
+        # 长音频交给引擎的批量解码路径 (whisper_long_form_sec)，不套用短句的延迟预算
+        self.long_form_sec = max(0.0, long_form_sec or 0.0)
+        self.alpha = alpha
+        # 归一化到 greedy 解码的 RTF 均值与平均偏差 (类似 TCP RTO 估计)
+        self.unit_rtf = initial_rtf
+        self.rtf_dev = initial_rtf / 2
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.target_sec > 0
+
+    def applies(self, duration_sec: float) -> bool:
+        """该时长的片段是否由策略决定解码参数"""
+        if not self.enabled:
+            return False
+        return not (self.long_form_sec and duration_sec >= self.long_form_sec)
+
+    def predict(self, duration_sec: float, beam_size: int) -> float:
+        """保守的延迟预测 (均值 + 2 倍偏差)，单位秒"""
+        with self._lock:
+            rtf = self.unit_rtf + 2 * self.rtf_dev
+        return duration_sec * rtf * beam_cost(beam_size)
+
+    def plan(self, duration_sec: float, defaults: Optional[dict] = None) -> dict:
+        """为一个片段生成解码参数；策略关闭或长音频时返回空 dict (引擎使用自身默认值)"""
+        if not self.applies(duration_sec):
+            return {}
+
+        defaults = defaults or {}
+        max_beam = max(1, int(defaults.get("beam_size", 1)))
+
+        beam = 1
+        for b in range(max_beam, 0, -1):
+            if self.predict(duration_sec, b) <= self.target_sec:
+                beam = b
+                break
+
+        max_tokens = int(MIN_NEW_TOKENS + duration_sec * TOKENS_PER_SEC)
+        opts = {
+            "beam_size": beam,
+            "best_of": min(beam, int(defaults.get("best_of", beam))),
+            "max_new_tokens": min(max_tokens, MAX_NEW_TOKENS),
+        }
+        # 只有在满配 beam 仍有余量时才允许温度回退 (回退会触发整段重解码)
+        if beam == max_beam and self.predict(duration_sec, beam) * 2 <= self.target_sec:
+            opts["temperature"] = DEFAULT_TEMPERATURES
+        else:
+            opts["temperature"] = 0.0
+        return opts
+
+    def observe(self, duration_sec: float, elapsed_sec: float, beam_size: int = 1) -> None:
+        """用一次实际解码耗时更新 RTF 估计"""
+        if duration_sec <= 0:
+            return
+        sample = elapsed_sec / (duration_sec * beam_cost(beam_size))
+        with self._lock:
+            if self.samples == 0:
+                self.unit_rtf = sample
+                self.rtf_dev = sample / 2
+            else:
+                err = sample - self.unit_rtf
+                self.unit_rtf += self.alpha * err
+                self.rtf_dev += self.alpha * (abs(err) - self.rtf_dev)
+            self.samples += 1
+
+    def describe(self) -> str:
+        with self._lock:
+            return f"target={self.target_sec * 1000:.0f}ms, rtf={self.unit_rtf:.3f}±{self.rtf_dev:.3f}, n={self.samples}"
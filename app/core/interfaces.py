@@ -1,5 +1,58 @@
+import math
 from abc import ABC, abstractmethod
-from typing import Any, Union
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+@dataclass
+class TranscriptSegment:
+    """单个识别片段及其置信度指标 (字段含义同 Whisper)"""
+    text: str
+    start: float = 0.0
+    end: float = 0.0
+    avg_logprob: Optional[float] = None
+    no_speech_prob: Optional[float] = None
+    compression_ratio: Optional[float] = None
+
+@dataclass
+class TranscriptionResult:
+    """
+    结构化识别结果 (Structured transcription result)
+    引擎未提供的指标保持为 None，置信度门控会跳过这些检查。
+    """
+    text: str = ""
+    segments: List[TranscriptSegment] = field(default_factory=list)
+    language: Optional[str] = None
+    language_prob: Optional[float] = None
+    duration: float = 0.0   # 音频时长 (秒)
+    elapsed: float = 0.0    # 解码耗时 (秒)
+    flags: List[str] = field(default_factory=list)  # 门控标记的原因
+
+    def __bool__(self):
+        return bool(self.text)
+
+    @property
+    def avg_logprob(self) -> Optional[float]:
+        """按片段时长加权的平均对数概率"""
+        scored = [s for s in self.segments if s.avg_logprob is not None]
+        if not scored:
+            return None
+        weights = [max(s.end - s.start, 1e-3) for s in scored]
+        return sum(s.avg_logprob * w for s, w in zip(scored, weights)) / sum(weights)
+
+    @property
+    def confidence(self) -> Optional[float]:
+        lp = self.avg_logprob
+        return None if lp is None else math.exp(lp)
+
+    @property
+    def no_speech_prob(self) -> Optional[float]:
+        probs = [s.no_speech_prob for s in self.segments if s.no_speech_prob is not None]
+        return max(probs) if probs else None
+
+    @property
+    def compression_ratio(self) -> Optional[float]:
+        ratios = [s.compression_ratio for s in self.segments if s.compression_ratio is not None]
+        return max(ratios) if ratios else None
 
 class ISTTEngine(ABC):
     """
@@ -12,16 +65,123 @@ class ISTTEngine(ABC):
         pass
 
     @abstractmethod
-    def transcribe(self, audio_data: Union[str, Any], language: str = "zh") -> str:
+    def transcribe(self, audio_data: Union[str, Any], language: str = "zh", **options) -> str:
         """
         转录音频
         :param audio_data: 文件路径(str) 或 内存音频数据(numpy/bytes)
         :param language: 目标语言代码
+        :param options: 单次解码参数 (beam_size / best_of / temperature / max_new_tokens)，
+                        不支持的项由引擎忽略
         :return: 识别后的文本
         """
         pass
 
+    def transcribe_detailed(self, audio_data: Union[str, Any], language: str = "zh", **options) -> TranscriptionResult:
+        """
+        转录音频并返回结构化结果 (片段、时间戳、语言、置信度)。
+        默认实现只包装 transcribe 的文本；能提供更多信息的引擎应覆盖此方法。
+        """
+        text = self.transcribe(audio_data, language, **options)
+        return TranscriptionResult(text=text, segments=[TranscriptSegment(text=text)] if text else [], language=language)
+
     @abstractmethod
     def is_ready(self) -> bool:
         """检查引擎是否就绪"""
-        pass
\ No newline at end of file
+        pass
+
+    def detect_language(self, audio_data: Any) -> Optional[Tuple[str, float]]:
+        """
+        语种识别 (可选能力)
+        :return: (语言代码, 概率)；引擎不支持时返回 None
+        """
+        return None
+
+    def decode_defaults(self) -> dict:
+        """引擎配置的默认解码参数，供解码策略作为上限参考"""
+        return {}
+
+
+@dataclass
+class TranslationResult:
+    """
+    翻译结果：fields 为 语言代码 -> 译文
+    source 记录实际产出结果的服务商 / 模型；fields 为空表示失败或超过截止时间 (timed_out)
+    """
+    fields: Dict[str, str] = field(default_factory=dict)
+    source: str = ""
+    hedged: bool = False
+    errors: List[str] = field(default_factory=list)
+    timed_out: bool = False
+
+    def __bool__(self):
+        return bool(self.fields)
+
+class TranslationJob:
+    """单次翻译请求的取消句柄 (由 TranslationWorker 持有，引擎在其上挂接关闭 HTTP 流等操作)"""
+
+    def __init__(self):
+        self.cancelled = False
+        self._hooks = []
+
+    def on_cancel(self, hook: Callable[[], None]) -> None:
+        if self.cancelled:
+            hook()
+        else:
+            self._hooks.append(hook)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        for hook in self._hooks:
+            try: hook()
+            except Exception: pass
+
+class ITranslationEngine(ABC):
+    """
+    翻译引擎抽象接口 (Interface for Translation Engine)
+    """
+
+    @abstractmethod
+    def initialize(self) -> None:
+        """加载模型 / 建立连接"""
+        pass
+
+    @abstractmethod
+    def translate(self, text: str, targets: Sequence[str], job: Optional[TranslationJob] = None,
+                  on_field: Optional[Callable[[str, str], None]] = None) -> TranslationResult:
+        """
+        把 text 一次性翻译成 targets 中的所有语言
+        :param job: 取消句柄，被取消时引擎应尽快返回
+        :param on_field: 流式回调 (lang, text)，某个语言先完成时调用；不支持流式的引擎可忽略
+        """
+        pass
+
+    def translate_batch(self, texts: Sequence[str], targets: Sequence[str],
+                        job: Optional[TranslationJob] = None) -> List[TranslationResult]:
+        """
+        一次翻译多句 (顺序与 texts 一致)。
+        默认实现逐句调用 translate；能在一次请求 / 一次解码中完成的引擎应覆盖此方法。
+        """
+        results = []
+        for text in texts:
+            if job is not None and job.cancelled:
+                results.append(TranslationResult())
+                continue
+            results.append(self.translate(text, targets, job=job))
+        return results
+
+    @abstractmethod
+    def is_ready(self) -> bool:
+        """检查引擎是否就绪"""
+        pass
+
+    @property
+    def cache_key(self) -> str:
+        """翻译记忆的命名空间 (模型不同时译文不可混用)"""
+        return type(self).__name__
+
+    def warm_up(self, force: bool = False) -> None:
+        """可选：预连接 / 预热"""
+        pass
+
+    def shutdown(self) -> None:
+        pass
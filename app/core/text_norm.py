@@ -0,0 +1,35 @@
+# app/core/text_norm.py
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+_KANA = re.compile(r"[\u3040-\u30ff]")
+_HANGUL = re.compile(r"[\uac00-\ud7af]")
+_HAN = re.compile(r"[\u4e00-\u9fff]")
+_CYRILLIC = re.compile(r"[\u0400-\u04ff]")
+_LATIN = re.compile(r"[A-Za-z]")
+
+
+def normalize_text(text: str) -> str:
+    """
+    比较用的文本归一化：全半角统一、小写、去掉标点与空白。
+    例如 "Hello, world!" 与 "hello world" 归一化后相同。
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _NON_WORD.sub("", text)
+
+
+def guess_script_lang(text: str) -> str:
+    """
+    按文字系统粗略判断语言：ja / ko / zh / ru / en (拉丁字母)；
+    不含任何文字 (数字、标点、表情) 时返回空字符串
+    """
+    if _KANA.search(text): return "ja"
+    if _HANGUL.search(text): return "ko"
+    if _HAN.search(text): return "zh"
+    if _CYRILLIC.search(text): return "ru"
+    if _LATIN.search(text): return "en"
+    return ""
@@ -1,26 +1,25 @@
-from .whisper_local import FasterWhisperSTT
-# 懒加载导入，防止如果用户没装 funasr 导致整个程序崩溃
-# 这里我们在工厂方法里动态 import
+from .registry import (
+    EngineCapabilities, EngineSpec,
+    register_engine, get_engine_spec, available_engines,
+)
+# 引擎模块均通过 registry 懒加载：只有被选中的引擎才会 import 其依赖
+# (faster_whisper / ctranslate2 / funasr / torch)
+
+DEFAULT_ENGINE = "faster_whisper"
 
 def create_stt_engine(config_data: dict):
     """
     工厂方法：根据配置生产 STT 引擎实例
     """
-    engine_type = config_data.get("stt_engine", "faster_whisper")
-    
-    if engine_type == "funasr":
+    engine_type = config_data.get("stt_engine", DEFAULT_ENGINE)
+
+    spec = get_engine_spec(engine_type)
+    if spec is None:
+        print(f"未知的 STT 引擎: {engine_type}, 回退到 Whisper")
+    elif engine_type != DEFAULT_ENGINE:
         try:
-            from .funasr_local import FunASRSTT
-            return FunASRSTT()
+            return spec.create(config_data)
         except Exception as e:
-            print(f"无法加载 FunASR 插件: {e}, 回退到 Whisper")
-            return FasterWhisperSTT()
+            print(f"无法加载 {engine_type} 插件: {e}, 回退到 Whisper")
 
-    # 默认 Faster-Whisper
-    # [Fix] 从配置中读取模型大小
-    size = config_data.get("whisper_model_size", "base")
-    return FasterWhisperSTT(
-        model_size=size, 
-        device="cpu",
-        compute_type="int8"
-    )
\ No newline at end of file
+    return get_engine_spec(DEFAULT_ENGINE).create(config_data)
@@ -72,7 +72,7 @@ class FunASRSTT(ISTTEngine):
             print(f"❌ FunASR Crash: {e}")
             self._ready = False
 
-    def transcribe(self, audio_data, language: str = "zh") -> str:
+    def transcribe(self, audio_data, language: str = "zh", **options) -> str:
         if not self._ready or not self.model:
             return ""
         
@@ -94,6 +94,8 @@ class FunASRSTT(ISTTEngine):
                 "cache": {},
                 "language": target_lang,
                 "itn": True,
+                # LLM 解码的生成长度上限 (模型默认 512)
+                "max_length": options.get("max_new_tokens") or 512,
             }
             
             # The model wrapper will handle the VAD -> ASR -> PUNC pipeline
@@ -114,4 +116,8 @@ class FunASRSTT(ISTTEngine):
                 except: pass
 
     def is_ready(self) -> bool:
-        return self._ready
\ No newline at end of file
+        return self._ready
+
+def create_engine(config_data: dict) -> FunASRSTT:
+    """registry 工厂入口"""
+    return FunASRSTT()
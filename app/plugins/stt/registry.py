@@ -0,0 +1,131 @@
+# app/plugins/stt/registry.py
+import importlib
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 第三方引擎通过该 entry point 组注册:
+#   [project.entry-points."polyglot.stt_engines"]
+#   my_engine = "my_pkg.spec:SPEC"
+# 目标对象可以是 EngineSpec (推荐，放在不含重型依赖的模块里)，
+# 也可以直接是工厂函数 factory(config_data) -> ISTTEngine。
+ENTRY_POINT_GROUP = "polyglot.stt_engines"
+
+
+@dataclass(frozen=True)
+class EngineCapabilities:
+    """引擎能力声明 (供 UI / 路由逻辑查询，不需要加载模型)"""
+    streaming: bool = False
+    batching: bool = False
+    timestamps: bool = False
+    languages: Tuple[str, ...] = ()  # 空元组表示多语言 / 未限制
+
+    def supports_language(self, lang: str) -> bool:
+        return not self.languages or lang in self.languages
+
+
+@dataclass
+class EngineSpec:
+    """
+    引擎描述：名称、能力与懒加载工厂。
+    factory 可以是 "module.path:callable" 字符串 (选中时才 import)，也可以是可调用对象。
+    """
+    name: str
+    label: str
+    factory: object
+    capabilities: EngineCapabilities = field(default_factory=EngineCapabilities)
+
+    def load_factory(self) -> Callable:
+        if callable(self.factory):
+            return self.factory
+        module_name, _, attr = str(self.factory).partition(":")
+        obj = importlib.import_module(module_name)
+        for part in filter(None, attr.split(".")):
+            obj = getattr(obj, part)
+        return obj
+
+    def create(self, config_data: dict):
+        return self.load_factory()(config_data)
+
+
+_BUILTIN_SPECS = [
+    EngineSpec(
+        name="faster_whisper",
+        label="Faster-Whisper (Offline/Stable)",
+        factory="app.plugins.stt.whisper_local:create_engine",
+        capabilities=EngineCapabilities(batching=True, timestamps=True),
+    ),
+    EngineSpec(
+        name="funasr",
+        label="FunASR (FunAudioLLM/High-Acc)",
+        factory="app.plugins.stt.funasr_local:create_engine",
+        capabilities=EngineCapabilities(
+            languages=("zh", "en", "ja", "yue", "ko", "vi", "th", "ms", "id", "ru"),
+        ),
+    ),
+]
+
+_registry: Dict[str, EngineSpec] = {}
+_entry_points: Optional[Dict[str, object]] = None
+
+
+def register_engine(spec: EngineSpec, replace: bool = False) -> None:
+    if spec.name in _registry and not replace:
+        raise ValueError(f"STT engine already registered: {spec.name}")
+    _registry[spec.name] = spec
+
+
+def _discover_entry_points() -> Dict[str, object]:
+    """只列出 entry point，不加载其模块"""
+    global _entry_points
+    if _entry_points is not None:
+        return _entry_points
+
+    _entry_points = {}
+    try:
+        from importlib.metadata import entry_points
+        eps = entry_points()
+        if hasattr(eps, "select"):
+            group = eps.select(group=ENTRY_POINT_GROUP)
+        else:  # Python < 3.10
+            group = eps.get(ENTRY_POINT_GROUP, [])
+        for ep in group:
+            if ep.name not in _registry:
+                _entry_points[ep.name] = ep
+    except Exception as e:
+        print(f"STT plugin discovery failed: {e}")
+    return _entry_points
+
+
+def _load_entry_point(name: str) -> Optional[EngineSpec]:
+    ep = _discover_entry_points().pop(name, None)
+    if ep is None:
+        return None
+    try:
+        target = ep.load()
+    except Exception as e:
+        print(f"无法加载 STT 插件 {name}: {e}")
+        return None
+
+    if isinstance(target, EngineSpec):
+        # 以 entry point 名称注册；复制一份，不修改插件自己持有的对象
+        spec = target if target.name == name else dataclasses.replace(target, name=name)
+    else:
+        spec = EngineSpec(name=name, label=name, factory=target)
+    register_engine(spec, replace=True)
+    return spec
+
+
+def get_engine_spec(name: str) -> Optional[EngineSpec]:
+    return _registry.get(name) or _load_entry_point(name)
+
+
+def available_engines() -> List[EngineSpec]:
+    """内置引擎 + 已安装的第三方引擎 (第三方会在此时加载其 spec)"""
+    for name in list(_discover_entry_points().keys()):
+        _load_entry_point(name)
+    return list(_registry.values())
+
+
+for _spec in _BUILTIN_SPECS:
+    register_engine(_spec)
@@ -1,48 +1,131 @@
 import numpy as np
+from dataclasses import asdict
 from faster_whisper import WhisperModel
-from app.core.interfaces import ISTTEngine
+from app.core.interfaces import ISTTEngine, TranscriptionResult, TranscriptSegment
+from app.plugins.stt.whisper_tuning import WhisperSettings, resolve_whisper_settings, cpu_feature_summary
+
+try:
+    # faster-whisper >= 1.1 才提供批量推理管线
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    BatchedInferencePipeline = None
+
+SAMPLE_RATE = 16000
 
 class FasterWhisperSTT(ISTTEngine):
-    def __init__(self, model_size="base", device="cpu", compute_type="int8"):
+    def __init__(self, model_size="base", device="cpu", compute_type="int8", **tuning):
+        """tuning: WhisperSettings 的其余字段 (cpu_threads / beam_size / batch_size ...)"""
         self.model_size = model_size
-        self.device = device
-        self.compute_type = compute_type
+        self.settings = WhisperSettings(device=device, compute_type=compute_type, **tuning)
         self.model = None
+        self.batched = None
         self._ready = False
 
+    @property
+    def device(self):
+        return self.settings.device
+
+    @property
+    def compute_type(self):
+        return self.settings.compute_type
+
     def initialize(self):
         print(f"Loading Faster-Whisper ({self.model_size})...")
+        print(f"Faster-Whisper settings: {self.settings.describe()} [{cpu_feature_summary()}]")
         try:
             self.model = WhisperModel(
                 self.model_size, 
-                device=self.device, 
-                compute_type=self.compute_type, 
-                cpu_threads=4
+                device=self.settings.device,
+                compute_type=self.settings.compute_type,
+                cpu_threads=self.settings.cpu_threads,
+                num_workers=self.settings.num_workers
             )
+            if BatchedInferencePipeline and self.settings.long_form_sec > 0:
+                self.batched = BatchedInferencePipeline(model=self.model)
             self._ready = True
             print("Faster-Whisper Loaded.")
         except Exception as e:
             print(f"Error loading model: {e}")
             self._ready = False
 
-    def transcribe(self, audio_data, language: str = "zh") -> str:
+    def _is_long_form(self, audio_data) -> bool:
+        if self.batched is None or not isinstance(audio_data, np.ndarray):
+            return False
+        return len(audio_data) / SAMPLE_RATE >= self.settings.long_form_sec
+
+    def decode_defaults(self) -> dict:
+        return {"beam_size": self.settings.beam_size, "best_of": self.settings.best_of}
+
+    def _decode_kwargs(self, options: dict) -> dict:
+        kwargs = {
+            "beam_size": options.get("beam_size", self.settings.beam_size),
+            "best_of": options.get("best_of", self.settings.best_of),
+        }
+        if "temperature" in options:
+            kwargs["temperature"] = options["temperature"]
+        if options.get("max_new_tokens"):
+            kwargs["max_new_tokens"] = options["max_new_tokens"]
+        return kwargs
+
+    def detect_language(self, audio_data):
+        # faster-whisper >= 1.1 提供独立的 detect_language (只跑一次 encoder)
+        if not self._ready or not hasattr(self.model, "detect_language"):
+            return None
+        lang, prob, _ = self.model.detect_language(audio=audio_data)
+        return lang, prob
+
+    def transcribe(self, audio_data, language: str = "zh", **options) -> str:
+        return self.transcribe_detailed(audio_data, language, **options).text
+
+    def transcribe_detailed(self, audio_data, language: str = "zh", **options) -> TranscriptionResult:
         if not self._ready or not self.model:
-            return ""
+            return TranscriptionResult()
         
+        decode_kwargs = self._decode_kwargs(options)
         try:
             # Faster-Whisper 原生支持 numpy float32 数组
             # 如果传入的是路径，它也能处理
-            segments, _ = self.model.transcribe(
-                audio_data, 
-                beam_size=5, 
-                language=language, 
-                vad_filter=True
+            if self._is_long_form(audio_data):
+                # 长音频：VAD 切分后按 batch_size 并行解码各片段
+                segments, info = self.batched.transcribe(
+                    audio_data,
+                    batch_size=self.settings.batch_size,
+                    language=language,
+                    **decode_kwargs
+                )
+            else:
+                segments, info = self.model.transcribe(
+                    audio_data, 
+                    language=language, 
+                    vad_filter=True,
+                    **decode_kwargs
+                )
+            segs = [
+                TranscriptSegment(
+                    text=s.text, start=s.start, end=s.end,
+                    avg_logprob=s.avg_logprob,
+                    no_speech_prob=s.no_speech_prob,
+                    compression_ratio=s.compression_ratio,
+                )
+                for s in segments
+            ]
+            return TranscriptionResult(
+                text=" ".join([s.text for s in segs]).strip(),
+                segments=segs,
+                language=info.language,
+                language_prob=info.language_probability,
+                duration=info.duration,
             )
-            text = " ".join([s.text for s in segments]).strip()
-            return text
         except Exception as e:
             print(f"Transcribe error: {e}")
-            return ""
+            return TranscriptionResult()
 
     def is_ready(self) -> bool:
-        return self._ready
\ No newline at end of file
+        return self._ready
+
+
+def create_engine(config_data: dict) -> FasterWhisperSTT:
+    """registry 工厂入口"""
+    # [Fix] 从配置中读取模型大小
+    size = config_data.get("whisper_model_size", "base")
+    return FasterWhisperSTT(model_size=size, **asdict(resolve_whisper_settings(config_data)))
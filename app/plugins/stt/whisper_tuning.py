@@ -0,0 +1,151 @@
+# app/plugins/stt/whisper_tuning.py
+import os
+import sys
+from dataclasses import dataclass
+
+# 按偏好排序的 compute_type；实际取值还需与 CTranslate2 在该设备上支持的类型求交集
+_PREFERRED_COMPUTE = {
+    "cuda": ("float16", "int8_float16", "int8", "float32"),
+    "cpu": ("int8", "int8_float32", "float32"),
+}
+
+
+@dataclass
+class WhisperSettings:
+    device: str = "cpu"
+    compute_type: str = "int8"
+    cpu_threads: int = 4
+    num_workers: int = 1
+    beam_size: int = 5
+    best_of: int = 5
+    batch_size: int = 8
+    long_form_sec: float = 30.0
+
+    def describe(self) -> str:
+        return (f"device={self.device}, compute_type={self.compute_type}, "
+                f"cpu_threads={self.cpu_threads}, num_workers={self.num_workers}, "
+                f"beam_size={self.beam_size}, best_of={self.best_of}, "
+                f"batch_size={self.batch_size}, long_form>={self.long_form_sec:g}s")
+
+
+def _cpu_flags() -> set:
+    """读取 CPU 指令集 (仅 Linux 可用，其它平台返回空集)"""
+    if not sys.platform.startswith("linux"):
+        return set()
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    return set(line.split(":", 1)[1].split())
+    except Exception:
+        pass
+    return set()
+
+
+def _physical_cores() -> int:
+    logical = os.cpu_count() or 1
+    try:
+        import psutil
+        return psutil.cpu_count(logical=False) or logical
+    except Exception:
+        return logical
+
+
+def _cuda_available() -> bool:
+    try:
+        import ctranslate2
+        return ctranslate2.get_cuda_device_count() > 0
+    except Exception:
+        return False
+
+
+def _supported_compute_types(device: str) -> set:
+    try:
+        import ctranslate2
+        return set(ctranslate2.get_supported_compute_types(device))
+    except Exception:
+        return set()
+
+
+def _auto_threads(device: str, num_workers: int) -> int:
+    if device == "cuda":
+        # GPU 解码时 CPU 只负责特征提取，少量线程即可
+        return 2
+    cores = _physical_cores()
+    # 给 UI / 录音线程 / torch (FunASR) 留出余量，避免小核数机器超额订阅
+    reserve = 1 if cores <= 8 else 2
+    per_worker = max(1, (cores - reserve) // max(1, num_workers))
+    # 超过 16 线程后 CTranslate2 的收益很小
+    return min(per_worker, 16)
+
+
+def _auto_beam(device: str, cpu_threads: int, compute_type: str) -> int:
+    if device == "cuda" or cpu_threads >= 6:
+        return 5
+    if compute_type.startswith("int8"):
+        return 3
+    # 没有 int8 加速 (老 CPU, 无 AVX2) 时搜索代价最高
+    return 2
+
+
+def resolve_whisper_settings(config_data: dict) -> WhisperSettings:
+    """
+    根据配置与硬件探测结果决定 Faster-Whisper 的运行参数。
+    配置项取 "auto" / 0 时自动推导。
+    """
+    device = str(config_data.get("whisper_device", "auto") or "auto").lower()
+    if device == "auto":
+        device = "cuda" if _cuda_available() else "cpu"
+
+    supported = _supported_compute_types(device)
+    compute_type = str(config_data.get("whisper_compute_type", "auto") or "auto").lower()
+    if compute_type != "auto" and supported and compute_type not in supported:
+        print(f"Compute type '{compute_type}' not supported on {device}, falling back to auto.")
+        compute_type = "auto"
+    if compute_type == "auto":
+        preferred = _PREFERRED_COMPUTE.get(device, _PREFERRED_COMPUTE["cpu"])
+        flags = _cpu_flags()
+        if supported:
+            compute_type = next((c for c in preferred if c in supported), "float32")
+        elif device == "cpu" and flags and not ({"avx2", "avx512f"} & flags):
+            # 无法从 CTranslate2 查询时，借助指令集判断 int8 是否划算
+            compute_type = "float32"
+        else:
+            compute_type = preferred[0]
+
+    num_workers = max(1, int(config_data.get("whisper_num_workers", 1) or 1))
+    cpu_threads = int(config_data.get("whisper_cpu_threads", 0) or 0)
+    if cpu_threads <= 0:
+        cpu_threads = _auto_threads(device, num_workers)
+
+    beam_size = int(config_data.get("whisper_beam_size", 0) or 0)
+    if beam_size <= 0:
+        beam_size = _auto_beam(device, cpu_threads, compute_type)
+    best_of = int(config_data.get("whisper_best_of", 0) or 0)
+    if best_of <= 0:
+        best_of = beam_size
+
+    batch_size = int(config_data.get("whisper_batch_size", 0) or 0)
+    if batch_size <= 0:
+        # 批量解码在 GPU 上近似线性扩展；CPU 上受限于线程数
+        batch_size = 16 if device == "cuda" else max(2, min(8, cpu_threads // 2))
+    long_form_sec = float(config_data.get("whisper_long_form_sec", 30) or 0)
+
+    return WhisperSettings(
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+        beam_size=beam_size,
+        best_of=best_of,
+        batch_size=batch_size,
+        long_form_sec=long_form_sec,
+    )
+
+
+def cpu_feature_summary() -> str:
+    """用于日志：列出与 CTranslate2 性能相关的指令集"""
+    flags = _cpu_flags()
+    relevant = [f for f in ("avx", "avx2", "fma", "avx512f", "avx512_vnni", "avx512_bf16", "avx_vnni") if f in flags]
+    cores = f"{os.cpu_count() or 1} logical / {_physical_cores()} physical cores"
+    return f"{cores}; ISA: {','.join(relevant) if relevant else 'unknown'}"
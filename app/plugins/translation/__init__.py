@@ -0,0 +1,43 @@
+from app.plugins.stt.registry import EngineSpec
+# 翻译引擎同样通过 "module:callable" 懒加载：选中离线引擎时才 import ctranslate2 / sentencepiece
+
+# 模板中可用的译文字段 (顺序即 LLM JSON 中的顺序)
+TARGET_LANGS = ("zh", "en", "ja", "ru")
+
+DEFAULT_ENGINE = "llm_remote"
+
+_ENGINES = {spec.name: spec for spec in [
+    EngineSpec(
+        name="llm_remote",
+        label="LLM API (OpenAI-compatible)",
+        factory="app.plugins.translation.llm_remote:create_engine",
+    ),
+    EngineSpec(
+        name="ct2_local",
+        label="CTranslate2 NLLB (Offline)",
+        factory="app.plugins.translation.ct2_local:create_engine",
+    ),
+]}
+
+
+def available_engines():
+    return list(_ENGINES.values())
+
+
+def create_translation_engine(config, **resources):
+    """
+    工厂方法：根据配置 trans_engine 生产翻译引擎实例
+    :param config: ConfigManager (引擎在每次请求时读取最新配置)
+    :param resources: 共享资源 (http / tracker)，由 TranslationService 提供
+    """
+    engine_type = config.get("trans_engine") or DEFAULT_ENGINE
+    spec = _ENGINES.get(engine_type)
+    if spec is None:
+        print(f"未知的翻译引擎: {engine_type}, 回退到 LLM API")
+    elif engine_type != DEFAULT_ENGINE:
+        try:
+            return spec.load_factory()(config, **resources)
+        except Exception as e:
+            print(f"无法加载翻译引擎 {engine_type}: {e}, 回退到 LLM API")
+
+    return _ENGINES[DEFAULT_ENGINE].load_factory()(config, **resources)
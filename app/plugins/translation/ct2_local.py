@@ -0,0 +1,124 @@
+# app/plugins/translation/ct2_local.py
+import os
+
+import ctranslate2
+import sentencepiece as spm
+
+from app.config import MODELS_DIR
+from app.core.interfaces import ITranslationEngine, TranslationResult
+from app.core.text_norm import guess_script_lang
+
+# 模板字段 -> NLLB (FLORES-200) 语言代码
+NLLB_CODES = {
+    "zh": "zho_Hans",
+    "en": "eng_Latn",
+    "ja": "jpn_Jpan",
+    "ru": "rus_Cyrl",
+    "ko": "kor_Hang",
+}
+
+
+def guess_source_lang(text):
+    """NLLB 需要显式的源语言标记；无法判断时按英文处理"""
+    return guess_script_lang(text) or "en"
+
+
+class CT2Translator(ITranslationEngine):
+    """
+    本地离线翻译 (CTranslate2 转换后的 NLLB 模型，放在 models/ 目录)
+
+    转换方式:
+      ct2-transformers-converter --model facebook/nllb-200-distilled-600M \
+          --output_dir models/nllb-200-distilled-600M-ct2 --quantization int8
+    并把原模型的 sentencepiece.bpe.model 复制到同一目录。
+    所有启用的目标语言作为一个 batch 一次解码 (同一源句，不同 target_prefix)。
+    """
+
+    def __init__(self, model_name, device="cpu", compute_type="int8", beam_size=2, cpu_threads=0):
+        self.model_dir = model_name if os.path.isabs(model_name) else os.path.join(MODELS_DIR, model_name)
+        self.device = device
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        self.cpu_threads = cpu_threads
+        self.translator = None
+        self.sp = None
+        self._ready = False
+
+    @property
+    def cache_key(self):
+        return f"ct2:{os.path.basename(self.model_dir)}"
+
+    def initialize(self):
+        print(f"Loading CTranslate2 translator ({self.model_dir}, {self.device}/{self.compute_type})...")
+        try:
+            self.translator = ctranslate2.Translator(
+                self.model_dir, device=self.device, compute_type=self.compute_type,
+                intra_threads=self.cpu_threads,
+            )
+            self.sp = spm.SentencePieceProcessor(model_file=os.path.join(self.model_dir, "sentencepiece.bpe.model"))
+            self._ready = True
+            print("CTranslate2 translator Loaded.")
+        except Exception as e:
+            print(f"Error loading translator: {e}")
+            self._ready = False
+
+    def is_ready(self):
+        return self._ready
+
+    def translate(self, text, targets, job=None, on_field=None):
+        result = self.translate_batch([text], targets, job=job)[0]
+        if on_field is not None:
+            for lang, value in result.fields.items():
+                on_field(lang, value)
+        return result
+
+    def translate_batch(self, texts, targets, job=None):
+        """所有句子 x 所有目标语言展开为一个 batch，一次 translate_batch 完成"""
+        if not self._ready:
+            return [TranslationResult(errors=["local translator not loaded"]) for _ in texts]
+
+        fields_list = [{} for _ in texts]
+        sources, prefixes, slots = [], [], []
+        for i, text in enumerate(texts):
+            src = guess_source_lang(text)
+            tokens = None
+            for lang in targets:
+                if lang == src:
+                    fields_list[i][lang] = text
+                elif lang in NLLB_CODES:
+                    if tokens is None:
+                        # 当前 NLLB 词表的顺序：[源语言代码] + tokens + </s> (非 legacy_behaviour)
+                        tokens = [NLLB_CODES[src]] + self.sp.encode(text, out_type=str) + ["</s>"]
+                    sources.append(tokens)
+                    prefixes.append([NLLB_CODES[lang]])
+                    slots.append((i, lang))
+
+        if sources and not (job and job.cancelled):
+            results = self.translator.translate_batch(
+                sources,
+                target_prefix=prefixes,
+                beam_size=self.beam_size,
+                max_decoding_length=256,
+            )
+            for (i, lang), res in zip(slots, results):
+                # 去掉输出开头的目标语言标记
+                hyp = [t for t in res.hypotheses[0] if t != NLLB_CODES[lang]]
+                fields_list[i][lang] = self.sp.decode(hyp)
+
+        return [TranslationResult(fields=fields, source=self.cache_key) for fields in fields_list]
+
+
+def create_engine(config, **_):
+    device = config.get("trans_local_device") or "auto"
+    if device == "auto":
+        device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+    compute_type = config.get("trans_local_compute_type") or "auto"
+    if compute_type == "auto":
+        compute_type = "int8_float16" if device == "cuda" else "int8"
+    return CT2Translator(
+        config.get("trans_local_model"),
+        device=device,
+        compute_type=compute_type,
+        beam_size=config.get("trans_local_beam_size") or 2,
+        cpu_threads=config.get("trans_local_cpu_threads") or 0,
+    )
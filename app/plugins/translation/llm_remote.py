@@ -0,0 +1,144 @@
+# app/plugins/translation/llm_remote.py
+import json
+
+from app.core.interfaces import ITranslationEngine, TranslationResult
+from app.plugins.translation import TARGET_LANGS
+from app.services.http_client import PooledHttpClient
+from app.services.providers import HedgedRequest, LatencyTracker, UsageStats, load_providers
+
+# 固定指令块：所有请求共享的前缀，修改会使服务商侧的前缀缓存全部失效
+SYSTEM_PREFIX = (
+    "You are a translation engine for VRChat. "
+    "Translate the user's input strictly into JSON. No markdown. "
+    "If the input is a JSON array of utterances, translate each one and return exactly one item "
+    "per utterance, in the same order.\n"
+)
+
+FIELD_LABELS = {
+    "zh": "Chinese Translation",
+    "en": "English Translation",
+    "ja": "Japanese Translation",
+    "ru": "Russian Translation",
+}
+
+
+class RemoteLLMTranslator(ITranslationEngine):
+    """
+    OpenAI 兼容 chat/completions 翻译 (原 TranslationWorker 内的实现)
+    多服务商对冲、截止时间与流式字段回调见 HedgedRequest
+    """
+
+    def __init__(self, config, http=None, tracker=None, usage=None):
+        self.cfg = config
+        self.http = http or PooledHttpClient()
+        self.tracker = tracker or LatencyTracker()
+        self.usage = usage or UsageStats()
+
+    def initialize(self):
+        self.warm_up(force=True)
+
+    def is_ready(self):
+        return bool(load_providers(self.cfg))
+
+    @property
+    def cache_key(self):
+        return self.cfg.get("model")
+
+    def warm_up(self, force=False):
+        # 备用服务商也预连接，对冲请求发出时同样无需握手
+        for provider in load_providers(self.cfg):
+            if force:
+                self.http.preconnect(provider.api_base)
+            else:
+                self.http.warm(provider.api_base)
+
+    def build_system_prompt(self, targets, batch=False):
+        """
+        固定指令块在前 (与语言集合、单句 / 批量无关，逐字节不变)，可变的字段列表在后，
+        让服务商的前缀缓存 (prompt caching) 在切换目标语言后仍能命中指令部分
+        """
+        json_fields = ",\n".join(f'"{k}": "{FIELD_LABELS[k]}"' for k in TARGET_LANGS if k in targets)
+        if batch:
+            fmt = '{"items": [\n{\n' + json_fields + '\n}\n]}'
+        else:
+            fmt = "{\n" + json_fields + "\n}"
+        return SYSTEM_PREFIX + "Format:\n" + fmt
+
+    def _hedge(self, system_prompt, user_text, requested, stream, on_field=None, job=None):
+        def build_payload(provider):
+            return {
+                "model": provider.model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_text}
+                ],
+                "response_format": {"type": "json_object"},
+                "temperature": 0.3
+            }
+
+        hedge = HedgedRequest(
+            self.http, self.tracker, load_providers(self.cfg), build_payload, requested,
+            hedge_default_ms=self.cfg.get("trans_hedge_default_ms"),
+            hedge_min_ms=self.cfg.get("trans_hedge_min_ms"),
+            deadline_ms=self.cfg.get("trans_deadline_ms"),
+            stream=stream,
+            on_field=on_field,
+            usage=self.usage,
+            stream_usage=self.cfg.get("trans_stream_usage"),
+        )
+        if job is not None:
+            job.on_cancel(hedge.cancel)
+        fields, provider = hedge.run()
+        return hedge, fields, provider
+
+    def translate(self, text, targets, job=None, on_field=None):
+        hedge, fields, provider = self._hedge(
+            self.build_system_prompt(targets), text, list(targets),
+            stream=bool(self.cfg.get("trans_stream")), on_field=on_field, job=job,
+        )
+        return TranslationResult(
+            fields=fields or {},
+            source=provider.name if provider else "",
+            hedged=hedge.hedged,
+            errors=hedge.errors,
+            timed_out=hedge.timed_out,
+        )
+
+    def translate_batch(self, texts, targets, job=None):
+        """多句合并为一次请求：输入 JSON 数组，输出 {"items": [...]}，按顺序拆回各句"""
+        if len(texts) == 1:
+            return [self.translate(texts[0], targets, job=job)]
+        hedge, fields, provider = self._hedge(
+            self.build_system_prompt(targets, batch=True), json.dumps(list(texts), ensure_ascii=False), ["items"],
+            stream=False, job=job,
+        )
+        items = (fields or {}).get("items")
+        if not isinstance(items, list):
+            items = []
+        results = []
+        for i in range(len(texts)):
+            item = items[i] if i < len(items) and isinstance(items[i], dict) else {}
+            results.append(TranslationResult(
+                fields={k: v for k, v in item.items() if k in targets and v},
+                source=provider.name if provider else "",
+                hedged=hedge.hedged,
+                # 请求本身成功、只是缺少这一句时没有服务商错误，由调用方单独提示
+                errors=hedge.errors if fields is None else [],
+                timed_out=hedge.timed_out,
+            ))
+        return results
+
+    def stats_text(self):
+        return f"[{self.http.stats_text()}] [{self.tracker.stats_text()}] [{self.usage.stats_text()}]"
+
+    def shutdown(self):
+        stats = self.tracker.stats_text()
+        if stats:
+            print(f"Translation providers: {stats}")
+        usage = self.usage.stats_text()
+        if usage:
+            print(f"Translation usage: {usage}")
+
+
+def create_engine(config, http=None, tracker=None, usage=None, **_):
+    return RemoteLLMTranslator(config, http=http, tracker=tracker, usage=usage)
@@ -1,10 +1,16 @@
 import pyaudio
-import winsound
 import numpy as np
+import time
 import traceback
 from PySide6.QtCore import QObject, Signal, QThread, QMutex
 
 from app.plugins.stt import create_stt_engine
+from app.core.decode_policy import LatencyBudgetPolicy
+from app.services.confidence_gate import ConfidenceGate, GATE_DROP
+from app.services.lang_id import LanguageRouter
+from app.services import sound_cues
+
+SAMPLE_RATE = 16000
 
 class AudioRecorder(QThread):
     def __init__(self, input_device_index):
@@ -43,14 +49,25 @@ class AudioRecorder(QThread):
     def get_audio_data(self):
         return b''.join(self.frames)
 
+# 预览引擎只追求速度：贪心解码、不做温度回退
+PREVIEW_OPTIONS = {"beam_size": 1, "best_of": 1, "temperature": 0.0}
+
 class AudioProcessor(QThread):
-    result_ready = Signal(str)
+    preview_ready = Signal(object)  # TranscriptionResult
+    result_ready = Signal(object)   # TranscriptionResult
     error_occurred = Signal(str)
     
-    def __init__(self, audio_bytes, engine):
+    def __init__(self, audio_bytes, engine, policy=None, preview_engine=None,
+                 router=None, engines=None, engine_name=None, speaker="default"):
         super().__init__()
         self.audio_bytes = audio_bytes
         self.engine = engine
+        self.policy = policy
+        self.preview_engine = preview_engine
+        self.router = router
+        self.engines = engines or {}
+        self.engine_name = engine_name
+        self.speaker = speaker
 
     def run(self):
         try:
@@ -60,9 +77,38 @@ class AudioProcessor(QThread):
 
             audio_np = np.frombuffer(self.audio_bytes, dtype=np.int16).flatten().astype(np.float32) / 32768.0
             
-            text = self.engine.transcribe(audio_np)
-            if text:
-                self.result_ready.emit(text)
+            # 逐句语种识别 + 引擎路由 (优先用预览小模型做语种识别)
+            language, engine = "zh", self.engine
+            if self.router:
+                language = self.router.identify(audio_np, [self.preview_engine, self.engine], self.speaker)
+                name, language = self.router.route(language, self.engines, self.engine_name)
+                engine = self.engines.get(name, self.engine)
+
+            # 双通道模式：小模型先出预览，再由大模型出最终结果
+            if self.preview_engine and self.preview_engine.is_ready():
+                preview = self.preview_engine.transcribe_detailed(audio_np, language, **PREVIEW_OPTIONS)
+                if preview:
+                    self.preview_ready.emit(preview)
+
+            duration = len(audio_np) / SAMPLE_RATE
+            options = {}
+            planned = bool(self.policy) and self.policy.applies(duration)
+            if planned:
+                options = self.policy.plan(duration, engine.decode_defaults())
+
+            t0 = time.perf_counter()
+            result = engine.transcribe_detailed(audio_np, language, **options)
+            elapsed = time.perf_counter() - t0
+            result.duration = duration
+            result.elapsed = elapsed
+            result.language = result.language or language
+
+            if planned:
+                self.policy.observe(duration, elapsed, options.get("beam_size", 1))
+                print(f"Decode {duration:.1f}s audio in {elapsed * 1000:.0f}ms "
+                      f"(beam={options.get('beam_size')}, {self.policy.describe()})")
+            if result:
+                self.result_ready.emit(result)
             else:
                 self.error_occurred.emit("no_speech")
         except Exception as e:
@@ -72,13 +118,20 @@ class AudioProcessor(QThread):
 class AudioService(QObject):
     log_signal = Signal(str)
     status_signal = Signal(str, str)
+    preview_signal = Signal(str, float) # text, stability (0~1，预览模型的置信度)
     result_signal = Signal(str)
+    flagged_signal = Signal(str, str)  # text, reasons (低置信度但未丢弃)
 
     def __init__(self, config_manager, lang_service):
         super().__init__()
         self.cfg = config_manager
         self.ls = lang_service
         self.stt_engine = create_stt_engine(self.cfg.data)
+        self.decode_policy = self._create_policy()
+        self.preview_engine = self._create_preview_engine()
+        self.gate = ConfidenceGate(self.cfg)
+        self.router = LanguageRouter(self.cfg)
+        self.extra_engines = self._create_extra_engines()
         
         self.recorder_thread = None
         self.processor_thread = None
@@ -88,6 +141,43 @@ class AudioService(QObject):
     def __del__(self):
         if self._pa: self._pa.terminate()
 
+    def _create_policy(self):
+        return LatencyBudgetPolicy(
+            target_ms=self.cfg.get("stt_latency_budget_ms") or 0,
+            long_form_sec=self.cfg.get("whisper_long_form_sec") or 0,
+        )
+
+    def _create_preview_engine(self):
+        """双通道模式下的快速预览引擎 (如 Whisper tiny/base)"""
+        if not self.cfg.get("stt_two_pass"):
+            return None
+        preview_cfg = dict(self.cfg.data)
+        preview_cfg["stt_engine"] = self.cfg.get("stt_preview_engine")
+        preview_cfg["whisper_model_size"] = self.cfg.get("stt_preview_model_size")
+        try:
+            return create_stt_engine(preview_cfg)
+        except Exception as e:
+            print(f"Preview engine unavailable: {e}")
+            return None
+
+    def _create_extra_engines(self):
+        """额外常驻的识别引擎 (stt_extra_engines)，供语种路由使用"""
+        main = self.cfg.get("stt_engine")
+        engines = {}
+        for name in self.cfg.get("stt_extra_engines") or []:
+            if name == main or name in engines:
+                continue
+            try:
+                engines[name] = create_stt_engine(dict(self.cfg.data, stt_engine=name))
+            except Exception as e:
+                print(f"Extra engine {name} unavailable: {e}")
+        return engines
+
+    def _resident_engines(self):
+        engines = {self.cfg.get("stt_engine"): self.stt_engine}
+        engines.update(self.extra_engines)
+        return engines
+
     def is_ready(self):
         """检查引擎是否完全加载完毕"""
         return self.stt_engine and self.stt_engine.is_ready()
@@ -98,6 +188,12 @@ class AudioService(QObject):
         self.status_signal.emit(self.ls.tr("status_init"), "#f39c12")
         try:
             self.stt_engine.initialize()
+            for engine in self.extra_engines.values():
+                engine.initialize()
+            if self.preview_engine:
+                self.preview_engine.initialize()
+                if not self.preview_engine.is_ready():
+                    self.log_signal.emit(self.ls.tr("log_preview_fail"))
             if self.stt_engine.is_ready():
                 self.log_signal.emit(self.ls.tr("log_engine_loaded"))
                 hk = self.cfg.get('hotkey_rec')
@@ -121,7 +217,13 @@ class AudioService(QObject):
         try:
             # 旧引擎垃圾回收
             self.stt_engine = None 
+            self.preview_engine = None
+            self.extra_engines = {}
             self.stt_engine = create_stt_engine(self.cfg.data)
+            self.decode_policy = self._create_policy()
+            self.preview_engine = self._create_preview_engine()
+            self.extra_engines = self._create_extra_engines()
+            self.router.reset()
             
             # 3. 重新初始化
             self.init_engine()
@@ -151,7 +253,7 @@ class AudioService(QObject):
         self.is_recording = True
         self.status_signal.emit(self.ls.tr("status_listening"), "#e74c3c")
         
-        if self.cfg.get("sound_cues"): winsound.Beep(800, 100)
+        if self.cfg.get("sound_cues"): sound_cues.play("rec_start")
         
         mic_index = self.cfg.get("mic_index")
         self.recorder_thread = AudioRecorder(mic_index)
@@ -161,14 +263,21 @@ class AudioService(QObject):
         if not self.is_recording or not self.recorder_thread: return
         self.is_recording = False
         
-        if self.cfg.get("sound_cues"): winsound.Beep(500, 100)
+        if self.cfg.get("sound_cues"): sound_cues.play("rec_stop")
         self.status_signal.emit(self.ls.tr("status_processing"), "#f39c12")
         
         self.recorder_thread.stop()
         audio_data = self.recorder_thread.get_audio_data()
         self.recorder_thread = None
 
-        self.processor_thread = AudioProcessor(audio_data, self.stt_engine)
+        self.processor_thread = AudioProcessor(
+            audio_data, self.stt_engine, self.decode_policy, self.preview_engine,
+            router=self.router,
+            engines=self._resident_engines(),
+            engine_name=self.cfg.get("stt_engine"),
+            speaker=f"mic:{self.cfg.get('mic_index')}"
+        )
+        self.processor_thread.preview_ready.connect(self._on_preview)
         self.processor_thread.result_ready.connect(self._on_transcription_success)
         self.processor_thread.error_occurred.connect(self._on_transcription_error)
         self.processor_thread.finished.connect(self._on_processor_finished)
@@ -178,7 +287,26 @@ class AudioService(QObject):
         if self.is_recording: self.stop_record()
         else: self.start_record()
 
-    def _on_transcription_success(self, text):
+    def _on_preview(self, result):
+        # 预览只用于展示和投机翻译，任何门控命中都直接丢弃
+        result, reasons = self.gate.apply(result)
+        if not reasons:
+            stability = result.confidence
+            self.preview_signal.emit(result.text, 1.0 if stability is None else stability)
+
+    def _on_transcription_success(self, result):
+        result, reasons = self.gate.apply(result)
+        text = result.text
+        if reasons:
+            detail = ", ".join(reasons)
+            if self.gate.action == GATE_DROP or "no_speech" in reasons:
+                self.log_signal.emit(self.ls.tr("log_gate_dropped").format(text, detail))
+                self.status_signal.emit(self.ls.tr("status_low_confidence"), "#7f8c8d")
+                return
+            self.log_signal.emit(self.ls.tr("log_gate_flagged").format(text, detail))
+            self.flagged_signal.emit(text, detail)
+            return
+
         self.log_signal.emit(self.ls.tr("log_trans_result").format(text))
         self.result_signal.emit(text)
 
@@ -0,0 +1,63 @@
+# app/services/confidence_gate.py
+from dataclasses import replace
+from typing import List, Tuple
+
+from app.core.interfaces import TranscriptionResult
+from app.core.text_norm import normalize_text
+
+GATE_OFF = "off"
+GATE_FLAG = "flag"
+GATE_DROP = "drop"
+
+
+class ConfidenceGate:
+    """
+    识别结果置信度门控：在调用 TranslationService.process 之前
+    过滤静音片段上的幻觉 ("Thanks for watching" 等) 与低置信度输出。
+    阈值每次从配置读取，修改 settings.json 后无需重载引擎。
+    """
+
+    def __init__(self, config_manager):
+        self.cfg = config_manager
+
+    @property
+    def action(self) -> str:
+        return self.cfg.get("stt_gate_action") or GATE_OFF
+
+    def apply(self, result: TranscriptionResult) -> Tuple[TranscriptionResult, List[str]]:
+        """返回 (过滤后的结果, 触发门控的原因列表)"""
+        if self.action == GATE_OFF or not result:
+            return result, []
+
+        min_logprob = self.cfg.get("stt_gate_min_avg_logprob")
+        max_no_speech = self.cfg.get("stt_gate_max_no_speech_prob")
+        max_ratio = self.cfg.get("stt_gate_max_compression_ratio")
+
+        # 1. 片段级：Whisper 的静音判定 (高 no_speech_prob 且低 logprob)
+        kept = [
+            s for s in result.segments
+            if not (s.no_speech_prob is not None and s.no_speech_prob > max_no_speech
+                    and s.avg_logprob is not None and s.avg_logprob < min_logprob)
+        ]
+        if len(kept) != len(result.segments):
+            result = replace(result, segments=kept, text=" ".join(s.text for s in kept).strip())
+
+        reasons = result.flags = []
+        if not result.text:
+            reasons.append("no_speech")
+            return result, reasons
+
+        # 2. 结果级
+        blocklist = {normalize_text(p) for p in (self.cfg.get("stt_gate_blocklist") or [])}
+        if normalize_text(result.text) in blocklist:
+            reasons.append("blocklist")
+
+        avg = result.avg_logprob
+        if avg is not None and avg < min_logprob:
+            reasons.append(f"avg_logprob={avg:.2f}")
+
+        ratio = result.compression_ratio
+        if ratio is not None and ratio > max_ratio:
+            reasons.append(f"compression_ratio={ratio:.2f}")
+
+        return result, reasons
@@ -1,10 +1,12 @@
-import time
+import threading
 import keyboard
-from PySide6.QtCore import QObject, Signal, QThread
+from PySide6.QtCore import QObject, Signal
 
-class HotkeyWorker(QThread):
+class HotkeyService(QObject):
     """
-    独立的按键监听线程，防止阻塞 UI
+    全局热键 (事件驱动)
+    通过 keyboard.hook 接收按下 / 松开事件，按扫描码维护当前按住的键集合，
+    组合键状态变化时立即发出信号；空闲时没有轮询。热键或录音模式修改后调用 reload()。
     """
     req_start_rec = Signal()
     req_stop_rec = Signal()
@@ -14,75 +16,76 @@ class HotkeyWorker(QThread):
     def __init__(self, config_manager):
         super().__init__()
         self.cfg = config_manager
-        self.running = True
+        self._lock = threading.Lock()
+        self._pressed = set()
+        self._combos = {}
+        self._active = {}
+        self._mode = "hold"
+        self._hook = None
+        self.reload()
 
-    def run(self):
-        last_rec_state = False
-        last_send_state = False
+    @staticmethod
+    def _parse(hotkey):
+        """"ctrl+b" -> [{ctrl 的所有扫描码}, {b 的扫描码}]；只支持单步组合键"""
+        if not hotkey:
+            return None
+        try:
+            steps = keyboard.parse_hotkey(hotkey)
+        except (ValueError, KeyError) as e:
+            print(f"Invalid hotkey {hotkey!r}: {e}")
+            return None
+        if len(steps) != 1:
+            print(f"Multi-step hotkey {hotkey!r} is not supported, using its last step.")
+        return [frozenset(alternatives) for alternatives in steps[-1]]
 
-        while self.running:
+    def reload(self):
+        with self._lock:
+            self._combos = {
+                "rec": self._parse(self.cfg.get("hotkey_rec")),
+                "send": self._parse(self.cfg.get("hotkey_send")),
+            }
+            self._active = {name: False for name in self._combos}
+            self._mode = self.cfg.get("rec_mode")
+        if self._hook is None:
             try:
-                time.sleep(0.05)
-                rec_key = self.cfg.get("hotkey_rec")
-                send_key = self.cfg.get("hotkey_send")
-                mode = self.cfg.get("rec_mode")
-
-                # 检测录音键
-                is_rec_pressed = False
-                try:
-                    if rec_key and keyboard.is_pressed(rec_key):
-                        is_rec_pressed = True
-                except: pass
-
-                if mode == "hold":
-                    if is_rec_pressed and not last_rec_state:
-                        self.req_start_rec.emit()
-                    elif not is_rec_pressed and last_rec_state:
-                        self.req_stop_rec.emit()
-                else:
-                    if is_rec_pressed and not last_rec_state:
-                        self.req_toggle_rec.emit()
-                
-                last_rec_state = is_rec_pressed
-
-                # 检测发送键
-                is_send_pressed = False
-                try:
-                    if send_key and keyboard.is_pressed(send_key):
-                        is_send_pressed = True
-                except: pass
-
-                if is_send_pressed and not last_send_state:
-                    self.req_send.emit()
-                
-                last_send_state = is_send_pressed
-
+                self._hook = keyboard.hook(self._on_event)
             except Exception as e:
-                print(f"Hotkey Poll Error: {e}")
-                time.sleep(1)
+                print(f"Hotkey hook error: {e}")
 
-    def stop(self):
-        self.running = False
-        self.wait()
+    def _on_event(self, event):
+        # 在 keyboard 的监听线程上调用；Qt 信号会排队投递到主线程
+        code = event.scan_code
+        if event.event_type == keyboard.KEY_DOWN:
+            if code in self._pressed:
+                return  # 按住时的自动重复
+            self._pressed.add(code)
+        else:
+            if code not in self._pressed:
+                return
+            self._pressed.discard(code)
 
-class HotkeyService(QObject):
-    # 转发 Worker 信号
-    req_start_rec = Signal()
-    req_stop_rec = Signal()
-    req_toggle_rec = Signal()
-    req_send = Signal()
+        with self._lock:
+            changes = []
+            for name, combo in self._combos.items():
+                active = bool(combo) and all(alternatives & self._pressed for alternatives in combo)
+                if active != self._active[name]:
+                    self._active[name] = active
+                    changes.append((name, active))
+            mode = self._mode
 
-    def __init__(self, config_manager):
-        super().__init__()
-        self.worker = HotkeyWorker(config_manager)
-        
-        # 信号连接
-        self.worker.req_start_rec.connect(self.req_start_rec)
-        self.worker.req_stop_rec.connect(self.req_stop_rec)
-        self.worker.req_toggle_rec.connect(self.req_toggle_rec)
-        self.worker.req_send.connect(self.req_send)
-        
-        self.worker.start()
+        for name, active in changes:
+            if name == "rec":
+                if mode == "hold":
+                    (self.req_start_rec if active else self.req_stop_rec).emit()
+                elif active:
+                    self.req_toggle_rec.emit()
+            elif active:
+                self.req_send.emit()
 
     def stop(self):
-        self.worker.stop()
\ No newline at end of file
+        if self._hook is not None:
+            try:
+                keyboard.unhook(self._hook)
+            except Exception:
+                pass
+            self._hook = None
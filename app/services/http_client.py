@@ -0,0 +1,171 @@
+# app/services/http_client.py
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    # 可选依赖：pip install httpx[http2]
+    import httpx
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
+
+def _counting_pool_class(pool_cls, on_connect):
+    """包装 urllib3 连接池类：其连接每次真正建立 TCP/TLS (connect) 时回调耗时"""
+    base_conn = pool_cls.ConnectionCls
+
+    class CountingConnection(base_conn):
+        def connect(self):
+            t0 = time.perf_counter()
+            super().connect()
+            on_connect((time.perf_counter() - t0) * 1000)
+
+    return type(pool_cls.__name__, (pool_cls,), {"ConnectionCls": CountingConnection})
+
+
+class _CountingAdapter(HTTPAdapter):
+    """统计 requests 实际使用的连接池中新建的连接 (不另建探测用的连接池)"""
+
+    def __init__(self, on_connect, **kwargs):
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: _counting_pool_class(cls, self._on_connect)
+            for scheme, cls in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+
+class PooledHttpClient:
+    """
+    共享的 keep-alive HTTP 客户端 (由 TranslationService 持有，多个 TranslationWorker 并发使用)
+
+    - 连接池复用 TCP/TLS 连接，省去每句话 100~300ms 的握手
+    - 启动时与空闲一段时间后主动预连接 (preconnect)
+    - 可选 HTTP/2 (需要 httpx + h2，不可用时回退到 requests)
+    - 统计连接复用率与握手耗时并输出到日志 (HTTP/1.1 模式；在连接真正建立时计数)
+    """
+
+    def __init__(self, pool_size=4, http2=False, idle_reconnect_sec=45):
+        self.idle_reconnect_sec = idle_reconnect_sec
+        self.http2 = bool(http2 and httpx is not None)
+        if http2 and not self.http2:
+            print("HTTP/2 requested but httpx[http2] is not installed, using HTTP/1.1 keep-alive.")
+
+        if self.http2:
+            self._client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+            self._session = None
+        else:
+            self._client = None
+            self._session = requests.Session()
+            adapter = _CountingAdapter(self._on_connect, pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_used = 0.0
+        self._idle_timer = None
+        self.requests_total = 0
+        self.new_connections = 0
+        self.handshake_ms = None
+
+    # === 统计 ===
+    def _on_connect(self, elapsed_ms):
+        # 预连接建立的连接不计入 new_connections：复用率只统计真正请求是否付出了握手
+        with self._lock:
+            self.handshake_ms = elapsed_ms
+            if not getattr(self._local, "preconnecting", False):
+                self.new_connections += 1
+
+    @property
+    def reuse_ratio(self):
+        with self._lock:
+            if not self.requests_total:
+                return 0.0
+            return max(0.0, 1.0 - self.new_connections / self.requests_total)
+
+    def stats_text(self):
+        if self.http2:
+            return f"h2, {self.requests_total} req"
+        hs = f"{self.handshake_ms:.0f}ms" if self.handshake_ms is not None else "n/a"
+        return f"http/1.1, reuse={self.reuse_ratio:.0%} ({self.requests_total} req / {self.new_connections} conn), handshake={hs}"
+
+    # === 请求 ===
+    def post(self, url, headers=None, json=None, timeout=10, stream=False):
+        if self._client is not None:
+            req = self._client.build_request("POST", url, headers=headers, json=json, timeout=timeout)
+            resp = self._client.send(req, stream=stream)
+        else:
+            resp = self._session.post(url, headers=headers, json=json, timeout=timeout, stream=stream)
+        self._record(url)
+        return resp
+
+    def _record(self, url):
+        with self._lock:
+            self.requests_total += 1
+            self._last_used = time.monotonic()
+        self._schedule_idle_reconnect(url)
+
+    # === 预连接 ===
+    def preconnect(self, base_url, background=True):
+        """提前完成 DNS/TCP/TLS 握手，使下一次真正的请求可以直接复用连接"""
+        if not base_url:
+            return
+        if background:
+            threading.Thread(target=self._preconnect, args=(base_url,), daemon=True).start()
+        else:
+            self._preconnect(base_url)
+
+    def warm(self, base_url):
+        """如果连接可能已被服务端关闭 (空闲过久)，重新预连接"""
+        if time.monotonic() - self._last_used >= self.idle_reconnect_sec:
+            self.preconnect(base_url)
+
+    def _preconnect(self, base_url):
+        parts = urlsplit(base_url)
+        origin = f"{parts.scheme}://{parts.netloc}/"
+        t0 = time.perf_counter()
+        self._local.preconnecting = True
+        try:
+            if self._client is not None:
+                self._client.head(origin, timeout=5)
+            else:
+                self._session.head(origin, timeout=5).close()
+        except Exception as e:
+            print(f"Preconnect to {origin} failed: {e}")
+            return
+        finally:
+            self._local.preconnecting = False
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        with self._lock:
+            self._last_used = time.monotonic()
+        print(f"HTTP preconnect {origin}: {elapsed_ms:.0f}ms [{self.stats_text()}]")
+
+    def _schedule_idle_reconnect(self, url):
+        if self.idle_reconnect_sec <= 0:
+            return
+        with self._lock:
+            if self._idle_timer:
+                self._idle_timer.cancel()
+            self._idle_timer = threading.Timer(self.idle_reconnect_sec, self._preconnect, args=(url,))
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def close(self):
+        with self._lock:
+            if self._idle_timer:
+                self._idle_timer.cancel()
+        if self._client is not None:
+            self._client.close()
+        if self._session is not None:
+            self._session.close()
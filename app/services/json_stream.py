@@ -0,0 +1,98 @@
+# app/services/json_stream.py
+import json
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+class IncrementalJSONFieldParser:
+    """
+    增量 JSON 字段解析器
+
+    逐块喂入 LLM 流式输出的 JSON 文本，每当顶层对象中的某个字符串值完整结束
+    (例如 "en": "Hello" 的右引号到达) 就立刻返回该字段，无需等待整个对象生成完毕。
+    嵌套对象 / 数组与非字符串值会被跳过；对象外的多余字符 (如 ```json 代码块标记) 被忽略。
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.expect_key = False
+        self.current_key = None
+        self._buf = []
+        self.fields = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        done = []
+        for ch in chunk:
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                    self._buf.append(ch)
+                elif ch == "\\":
+                    self.escape = True
+                    self._buf.append(ch)
+                elif ch == '"':
+                    self.in_string = False
+                    self._on_string_end(done)
+                else:
+                    self._buf.append(ch)
+                continue
+
+            if ch == '"':
+                if self.depth >= 1:
+                    self.in_string = True
+                    self._buf = []
+            elif ch in "{[":
+                self.depth += 1
+                if self.depth == 1 and ch == "{":
+                    self.expect_key = True
+            elif ch in "}]":
+                self.depth = max(0, self.depth - 1)
+            elif self.depth == 1:
+                if ch == ",":
+                    self.expect_key = True
+                elif ch == ":":
+                    self.expect_key = False
+        return done
+
+    def _on_string_end(self, done):
+        if self.depth != 1:
+            return
+        raw = "".join(self._buf)
+        try:
+            value = json.loads(f'"{raw}"')
+        except ValueError:
+            value = raw
+        if self.expect_key:
+            self.current_key = value
+        elif self.current_key is not None:
+            self.fields[self.current_key] = value
+            done.append((self.current_key, value))
+            self.current_key = None
+
+
+def iter_sse_content(lines: Iterable, usage: Optional[dict] = None) -> Iterator[str]:
+    """
+    从 OpenAI 兼容的 SSE 流 (data: {...}) 中提取 delta.content 文本块
+    :param usage: 传入 dict 时，把流末尾的 usage 统计 (stream_options.include_usage) 写入其中
+    遇到 data: [DONE] 即停止；需要复用连接的调用方应继续读完 lines 中剩余的内容
+    """
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = line.strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        try:
+            event = json.loads(data)
+        except ValueError:
+            continue
+        if usage is not None and event.get("usage"):
+            usage.update(event["usage"])
+        for choice in event.get("choices") or []:
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                yield content
@@ -0,0 +1,120 @@
+# app/services/lang_id.py
+import threading
+import time
+
+from app.core.interfaces import ISTTEngine
+from app.plugins.stt import get_engine_spec
+
+SAMPLE_RATE = 16000
+
+
+class LanguageRouter:
+    """
+    逐句语种识别与引擎路由
+
+    1. 用 Whisper 的 detect_language 只分析开头几秒 (stt_langid_window_sec)；
+       没有任何已加载的引擎提供 detect_language 时 (例如只用 FunASR)，语种识别不可用，按 stt_default_language 解码
+    2. 每个说话人 (当前按麦克风区分) 维护粘滞缓存：置信度不够高时沿用上一次的语种，
+       避免短句在两种语言之间来回跳
+    3. 多个引擎常驻时，按 stt_language_routes 或引擎能力声明挑选最合适的引擎
+    """
+
+    def __init__(self, config_manager):
+        self.cfg = config_manager
+        self._sticky = {}  # speaker -> (lang, prob, timestamp)
+        self._lock = threading.Lock()
+        self._warned_unavailable = False
+
+    @property
+    def fixed_language(self):
+        lang = self.cfg.get("stt_language") or "auto"
+        return None if lang == "auto" else lang
+
+    def identify(self, audio_np, detectors, speaker="default"):
+        """返回本句的解码语种；detectors 为按优先级排列的候选引擎 (优先用小模型)"""
+        fixed = self.fixed_language
+        if fixed:
+            return fixed
+
+        default_lang = self.cfg.get("stt_default_language") or "zh"
+        now = time.monotonic()
+        with self._lock:
+            cached = self._sticky.get(speaker)
+        if cached and now - cached[2] > float(self.cfg.get("stt_langid_sticky_sec") or 0):
+            cached = None
+
+        detected = self._detect(audio_np, detectors)
+        if detected is None:
+            return cached[0] if cached else default_lang
+
+        lang, prob = detected
+        min_prob = float(self.cfg.get("stt_langid_min_prob") or 0)
+        switch_prob = float(self.cfg.get("stt_langid_switch_prob") or min_prob)
+
+        if cached and lang != cached[0] and prob < switch_prob:
+            # 置信度不足以切换语种：保持粘滞语种，但刷新时间戳
+            lang, prob = cached[0], cached[1]
+        elif not cached and prob < min_prob:
+            return default_lang
+
+        with self._lock:
+            self._sticky[speaker] = (lang, prob, now)
+        return lang
+
+    def _detect(self, audio_np, detectors):
+        window = int(float(self.cfg.get("stt_langid_window_sec") or 3) * SAMPLE_RATE)
+        clip = audio_np[:window]
+        available = False
+        for engine in detectors:
+            if engine is None or not engine.is_ready() or not self._can_detect(engine):
+                continue
+            available = True
+            try:
+                res = engine.detect_language(clip)
+            except Exception as e:
+                print(f"Language detection failed: {e}")
+                res = None
+            if res:
+                return res
+        if not available and not self._warned_unavailable:
+            self._warned_unavailable = True
+            default_lang = self.cfg.get("stt_default_language") or "zh"
+            print(f"Language ID unavailable: no loaded STT engine supports detect_language, decoding as '{default_lang}'")
+        return None
+
+    @staticmethod
+    def _can_detect(engine):
+        return type(engine).detect_language is not ISTTEngine.detect_language
+
+    def route(self, lang, engines, default_name):
+        """
+        在常驻引擎 {name: engine} 中为该语种选择引擎，返回 (引擎名, 解码语种)。
+        优先级：stt_language_routes 显式映射 > 默认引擎 (若支持该语种) > 其它支持该语种的引擎；
+        没有任何常驻引擎支持该语种时，回退到 stt_default_language，而不是让引擎按自己的默认语种硬解
+        """
+        routes = self.cfg.get("stt_language_routes") or {}
+        name = routes.get(lang)
+        if name in engines and engines[name].is_ready() and self._supports(name, lang):
+            return name, lang
+
+        if self._supports(default_name, lang):
+            return default_name, lang
+        for name, engine in engines.items():
+            if name != default_name and engine.is_ready() and self._supports(name, lang):
+                return name, lang
+
+        fallback = self.cfg.get("stt_default_language") or "zh"
+        if fallback != lang and self._supports(default_name, fallback):
+            print(f"No resident STT engine supports '{lang}', decoding as '{fallback}'")
+            return default_name, fallback
+        return default_name, lang
+
+    @staticmethod
+    def _supports(name, lang):
+        spec = get_engine_spec(name)
+        return spec is None or spec.capabilities.supports_language(lang)
+
+    def reset(self):
+        with self._lock:
+            self._sticky.clear()
+        self._warned_unavailable = False
@@ -0,0 +1,126 @@
+# app/services/osc_input.py
+import threading
+
+from pythonosc.dispatcher import Dispatcher
+from pythonosc.osc_server import BlockingOSCUDPServer
+from PySide6.QtCore import QObject, Signal
+
+ACTION_HOLD = "hold"      # 参数为真开始录音，为假停止 (按住说话)
+ACTION_TOGGLE = "toggle"  # 上升沿切换录音
+ACTION_START = "start"
+ACTION_STOP = "stop"
+ACTION_SEND = "send"      # 上升沿发送待发送的翻译
+
+
+def _is_on(args):
+    """Avatar 参数的真假：无参数视为一次触发；Float 以 0.5 为界"""
+    if not args:
+        return True
+    v = args[0]
+    if isinstance(v, str):
+        return v.strip().lower() in ("1", "true", "on")
+    try:
+        return float(v) > 0.5
+    except (TypeError, ValueError):
+        return bool(v)
+
+
+class OscInputService(QObject):
+    """
+    OSC 输入：把 VRChat 发出的 Avatar 参数 (默认端口 9001) 或自定义地址映射为录音 / 发送请求，
+    信号与 HotkeyService 相同。服务器在独立线程上阻塞接收，收到即分发，无轮询。
+    """
+    req_start_rec = Signal()
+    req_stop_rec = Signal()
+    req_toggle_rec = Signal()
+    req_send = Signal()
+    log_signal = Signal(str)
+
+    def __init__(self, config_manager, lang_service):
+        super().__init__()
+        self.cfg = config_manager
+        self.ls = lang_service
+        self.server = None
+        self._thread = None
+        self._endpoint = None
+        self._bindings = {}
+        self._last = {}
+
+    # === 映射 ===
+    def _load_bindings(self):
+        bindings = {}
+        for item in self.cfg.get("osc_input_bindings") or []:
+            if isinstance(item, dict) and item.get("address") and item.get("action"):
+                bindings[item["address"]] = item["action"]
+        self._bindings = bindings
+        self._last = {}
+
+    def handle(self, address, *args):
+        """处理一条 OSC 消息 (在服务器线程上调用)"""
+        action = self._bindings.get(address)
+        if action is None:
+            return
+        on = _is_on(args)
+        was_on = self._last.get(address, False)
+        self._last[address] = on
+
+        if action == ACTION_HOLD:
+            if on and not was_on:
+                self.req_start_rec.emit()
+            elif not on and was_on:
+                self.req_stop_rec.emit()
+            return
+
+        # 其余动作只在上升沿触发 (无参数的消息每次都算一次触发)
+        if not on or (was_on and args):
+            return
+        if action == ACTION_TOGGLE:
+            self.req_toggle_rec.emit()
+        elif action == ACTION_START:
+            self.req_start_rec.emit()
+        elif action == ACTION_STOP:
+            self.req_stop_rec.emit()
+        elif action == ACTION_SEND:
+            self.req_send.emit()
+
+    # === 服务器 ===
+    def start(self):
+        self._load_bindings()
+        if not self.cfg.get("osc_input_enabled"):
+            return
+        host = self.cfg.get("osc_input_host") or "127.0.0.1"
+        port = int(self.cfg.get("osc_input_port") or 9001)
+
+        dispatcher = Dispatcher()
+        dispatcher.set_default_handler(self.handle)
+        try:
+            self.server = BlockingOSCUDPServer((host, port), dispatcher)
+        except OSError as e:
+            self.server = None
+            self.log_signal.emit(self.ls.tr("err_osc_input_bind").format(host, port, e))
+            return
+        self._endpoint = (host, port)
+        self._thread = threading.Thread(target=self.server.serve_forever, name="osc-input", daemon=True)
+        self._thread.start()
+        self.log_signal.emit(self.ls.tr("log_osc_input_listening").format(host, port))
+
+    def reload(self):
+        """设置保存后调用：映射立即生效，地址 / 端口 / 开关变化时重启服务器"""
+        endpoint = (self.cfg.get("osc_input_host") or "127.0.0.1", int(self.cfg.get("osc_input_port") or 9001))
+        running = self.server is not None
+        if running == bool(self.cfg.get("osc_input_enabled")) and (not running or endpoint == self._endpoint):
+            self._load_bindings()
+            return
+        self.stop()
+        self.start()
+
+    def stop(self):
+        if self.server is None:
+            return
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+        self._endpoint = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
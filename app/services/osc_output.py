@@ -0,0 +1,232 @@
+# app/services/osc_output.py
+import queue
+import socket
+import threading
+import time
+
+from pythonosc.osc_bundle_builder import OscBundleBuilder, IMMEDIATELY
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+FORMAT_CHATBOX = "chatbox"  # VRChat: /chatbox/input [text, True, notify]，经过 ChatboxScheduler 限速分页
+FORMAT_MESSAGE = "message"  # 单条消息 [text]，全文立即发送 (OBS / 桥接程序)
+FORMAT_BUNDLE = "bundle"    # bundle: {address}/text [text] + {address}/final [bool]
+
+# 解析失败后的重试间隔 (指数退避)
+RESOLVE_BACKOFF_MIN = 1.0
+RESOLVE_BACKOFF_MAX = 60.0
+
+DEFAULT_ADDRESSES = {
+    FORMAT_CHATBOX: "/chatbox/input",
+    FORMAT_MESSAGE: "/polyglot/{kind}",
+    FORMAT_BUNDLE: "/polyglot",
+}
+
+
+def _numeric_sockaddr(host, port):
+    """IP 字面量无需 DNS，直接得到地址"""
+    try:
+        socket.inet_aton(host)
+    except OSError:
+        return None
+    return host, int(port)
+
+
+def _message(address, args):
+    builder = OscMessageBuilder(address=address)
+    for arg in args:
+        builder.add_arg(arg)
+    return builder.build()
+
+
+class OscTarget:
+    """
+    一个 OSC 输出目标 (osc_targets 中的一项)
+    address 可使用 {kind} 占位符 (final / partial)
+    """
+
+    def __init__(self, name, host="127.0.0.1", port=9000, format=FORMAT_CHATBOX, address=None,
+                 partial=False, enabled=True):
+        self.name = name
+        self.host = host
+        self.port = int(port)
+        self.format = format if format in DEFAULT_ADDRESSES else FORMAT_CHATBOX
+        self.address = address or DEFAULT_ADDRESSES[self.format]
+        self.partial = partial
+        self.enabled = enabled
+        self.sent = 0
+        self.errors = 0
+        self.dropped = 0
+        # 地址解析状态 (由 OscFanout 的解析线程维护)
+        self.sockaddr = _numeric_sockaddr(self.host, self.port)
+        self.resolving = False
+        self.retry_at = 0.0
+        self.backoff = RESOLVE_BACKOFF_MIN
+        self.pending = None  # 地址解析完成前最近的一个数据包
+
+    @classmethod
+    def from_config(cls, item, index=0):
+        return cls(
+            item.get("name") or f"target{index + 1}",
+            host=item.get("host") or "127.0.0.1",
+            port=item.get("port") or 9000,
+            format=item.get("format") or FORMAT_CHATBOX,
+            address=item.get("address"),
+            partial=bool(item.get("partial")),
+            enabled=item.get("enabled", True),
+        )
+
+    @property
+    def is_chatbox(self):
+        return self.format == FORMAT_CHATBOX
+
+    def key(self):
+        """编码结果只取决于格式与地址：相同的目标共享同一份已编码的数据包"""
+        return self.format, self.address
+
+    def encode(self, text, notify=True, partial=False):
+        kind = "partial" if partial else "final"
+        address = self.address.replace("{kind}", kind)
+        if self.format == FORMAT_CHATBOX:
+            return _message(address, [text, True, notify]).dgram
+        if self.format == FORMAT_MESSAGE:
+            return _message(address, [text]).dgram
+        bundle = OscBundleBuilder(IMMEDIATELY)
+        bundle.add_content(_message(f"{address}/text", [text]))
+        bundle.add_content(_message(f"{address}/final", [not partial]))
+        return bundle.build().dgram
+
+    def resolve(self):
+        """阻塞的 DNS 查询，只在解析线程上调用"""
+        info = socket.getaddrinfo(self.host, self.port, socket.AF_INET, socket.SOCK_DGRAM)
+        return info[0][4]
+
+
+class OscFanout:
+    """
+    多目标 OSC 输出
+
+    调用方 (Qt 主线程) 只负责编码并把 (目标, 数据包) 放入队列；
+    独立的发送线程使用非阻塞 UDP socket 逐个 sendto，单个目标解析失败或不可达只记录错误，不影响其它目标。
+    域名在单独的解析线程上查询 (失败按指数退避重试)，发送循环里从不做 DNS；
+    地址未就绪的目标只保留最近一个数据包，解析成功后补发。
+    """
+
+    def __init__(self, targets_config=None, log_fn=None):
+        self.log_fn = log_fn or print
+        self.targets = []
+        self._queue = queue.Queue()
+        self._resolve_queue = queue.Queue()
+        self._pending_lock = threading.Lock()
+        self._resolver = threading.Thread(target=self._resolve_loop, name="osc-resolver", daemon=True)
+        self._resolver.start()
+        self.configure(targets_config)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        self._thread = threading.Thread(target=self._run, name="osc-sender", daemon=True)
+        self._thread.start()
+
+    def configure(self, targets_config):
+        items = targets_config or [{"name": "VRChat"}]
+        targets = [OscTarget.from_config(item, i) for i, item in enumerate(items) if isinstance(item, dict)]
+        for target in targets:
+            if target.sockaddr is None:
+                self._request_resolve(target)
+        self.targets = targets
+
+    def _request_resolve(self, target):
+        if not target.resolving:
+            target.resolving = True
+            self._resolve_queue.put(target)
+
+    @property
+    def chatbox_targets(self):
+        return [t for t in self.targets if t.enabled and t.is_chatbox]
+
+    # === 调用方线程 ===
+    def send_chatbox(self, text, notify=True):
+        """经过 ChatboxScheduler 限速 / 分页后的 Chatbox 页面"""
+        self._enqueue(self.chatbox_targets, text, notify, partial=False)
+
+    def send_message(self, text, notify=True):
+        """非 Chatbox 目标：完整文本立即发送 (中间结果只发给开启了 partial 的目标)"""
+        partial = not notify
+        targets = [t for t in self.targets if t.enabled and not t.is_chatbox and (t.partial or not partial)]
+        self._enqueue(targets, text, notify, partial)
+
+    def _enqueue(self, targets, text, notify, partial):
+        packets = {}
+        for target in targets:
+            key = target.key()
+            if key not in packets:
+                packets[key] = target.encode(text, notify, partial)
+            self._queue.put((target, packets[key]))
+
+    # === 发送线程 ===
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            target, packet = item
+            with self._pending_lock:
+                addr = target.sockaddr
+                if addr is None:
+                    # 地址未就绪：保留最近的数据包，到了重试时间再交给解析线程
+                    if target.pending is not None:
+                        target.dropped += 1
+                    target.pending = packet
+                    if time.monotonic() >= target.retry_at:
+                        self._request_resolve(target)
+                    continue
+            try:
+                self._sock.sendto(packet, addr)
+                target.sent += 1
+            except (BlockingIOError, InterruptedError):
+                # 发送缓冲区满：稍后重试一次，仍失败则丢弃该包
+                time.sleep(0.001)
+                try:
+                    self._sock.sendto(packet, addr)
+                    target.sent += 1
+                except OSError as e:
+                    self._on_error(target, e)
+            except OSError as e:
+                self._on_error(target, e)
+
+    # === 解析线程 ===
+    def _resolve_loop(self):
+        while True:
+            target = self._resolve_queue.get()
+            if target is None:
+                break
+            try:
+                addr = target.resolve()
+                target.backoff = RESOLVE_BACKOFF_MIN
+            except OSError as e:
+                addr = None
+                target.retry_at = time.monotonic() + target.backoff
+                target.backoff = min(target.backoff * 2, RESOLVE_BACKOFF_MAX)
+                self._on_error(target, e)
+            with self._pending_lock:
+                target.sockaddr = addr
+                target.resolving = False
+                packet, target.pending = target.pending, None
+            if packet is not None:
+                if target.sockaddr is not None:
+                    self._queue.put((target, packet))
+                else:
+                    target.dropped += 1
+
+    def _on_error(self, target, e):
+        target.errors += 1
+        # 只在第一次和之后每 50 次失败时提示，避免刷屏
+        if target.errors == 1 or target.errors % 50 == 0:
+            self.log_fn(f"OSC target {target.name} ({target.host}:{target.port}) failed: {e}")
+
+    def stats_text(self):
+        return ", ".join(f"{t.name}: sent {t.sent} / err {t.errors} / dropped {t.dropped}" for t in self.targets)
+
+    def close(self):
+        self._resolve_queue.put(None)
+        self._queue.put(None)
+        self._thread.join(timeout=1)
+        self._sock.close()
@@ -0,0 +1,131 @@
+# app/services/osc_scheduler.py
+import time
+from collections import deque
+
+from PySide6.QtCore import QObject, QTimer
+
+# 分页时优先在这些字符之后断开
+_BREAK_CHARS = "\n 。！？；，、.!?;,"
+
+
+def paginate(text, limit=144):
+    """按 Chatbox 字数上限分页，尽量在标点 / 空白处断开，多页时附加 (i/n) 页码"""
+    if len(text) <= limit:
+        return [text]
+    body = max(1, limit - 8)  # 预留 " (99/99)"
+    pages, rest = [], text
+    while rest:
+        if len(rest) <= body:
+            pages.append(rest.rstrip())
+            break
+        cut = max(rest.rfind(ch, 0, body) for ch in _BREAK_CHARS) + 1
+        if cut < body // 2:
+            cut = body
+        pages.append(rest[:cut].rstrip())
+        rest = rest[cut:].lstrip()
+    n = len(pages)
+    return [f"{p} ({i + 1}/{n})" for i, p in enumerate(pages)]
+
+
+class _Message:
+    def __init__(self, text, notify, partial, limit):
+        self.text = text
+        self.notify = notify
+        self.partial = partial
+        self.started = False
+        # 流式中间结果很快会被替换，只显示第一页
+        pages = paginate(text, limit)
+        self.pages = deque(pages[:1] if partial else pages)
+
+
+class ChatboxScheduler(QObject):
+    """
+    VRChat Chatbox 发送调度 (在 Qt 主线程上运行)
+
+    - 限速：两次 /chatbox/input 之间至少间隔 osc_min_interval_ms，超出频率的消息排队而不是被 VRChat 静默丢弃
+    - 分页：超过 osc_chatbox_limit 字的消息拆页，每页停留 osc_page_interval_ms
+    - 合并：排队中的中间结果总是被新消息替换；排队中的完整消息按 osc_queue_policy
+      替换 (replace，只显示最新一句) 或合并 (merge，拼成一条再分页)
+    """
+
+    def __init__(self, config_manager, send_fn, parent=None):
+        super().__init__(parent)
+        self.cfg = config_manager
+        self.send_fn = send_fn
+        self._queue = deque()
+        self._current = None
+        self._last_sent = 0.0
+        self._page_due = 0.0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._pump)
+        self.sent = 0
+        self.dropped = 0
+        self.merged = 0
+
+    def submit(self, text, notify=True):
+        if not text: return
+        limit = self.cfg.get("osc_chatbox_limit") or 144
+        partial = not notify
+
+        # 还在等待限速、一页都没发出的当前消息仍视为排队中，可被替换 / 合并
+        if self._current is not None and not self._current.started:
+            self._queue.appendleft(self._current)
+            self._current = None
+
+        # 排队中的中间结果已经过时
+        stale = [m for m in self._queue if m.partial]
+        for m in stale:
+            self._queue.remove(m)
+        self.dropped += len(stale)
+        if self._current is not None and self._current.partial:
+            self.dropped += len(self._current.pages)
+            self._current = None
+
+        queued = list(self._queue)
+        if queued and not partial:
+            self._queue.clear()
+            if self.cfg.get("osc_queue_policy") == "merge":
+                text = " ".join([m.text for m in queued] + [text])
+                self.merged += len(queued)
+            else:
+                self.dropped += len(queued)
+        elif queued and partial:
+            # 完整消息仍在排队时，不让中间结果插队
+            self.dropped += 1
+            return
+
+        self._queue.append(_Message(text, notify, partial, limit))
+        self._pump()
+
+    def _pump(self):
+        now = time.monotonic()
+        if self._current is not None and not self._current.pages:
+            self._current = None
+        if self._current is None:
+            if not self._queue:
+                return
+            self._current = self._queue.popleft()
+            self._page_due = 0.0
+
+        min_interval = (self.cfg.get("osc_min_interval_ms") or 0) / 1000
+        ready_at = max(self._last_sent + min_interval, self._page_due)
+        if now < ready_at:
+            if not self._timer.isActive():
+                self._timer.start(int((ready_at - now) * 1000) + 1)
+            return
+
+        msg = self._current
+        # 只有消息的第一页触发 VRChat 通知音
+        self.send_fn(msg.pages.popleft(), msg.notify and not msg.started)
+        msg.started = True
+        self.sent += 1
+        self._last_sent = now
+        self._page_due = now + (self.cfg.get("osc_page_interval_ms") or 0) / 1000 if msg.pages else 0.0
+
+        if msg.pages or self._queue:
+            delay = max(min_interval, self._page_due - now)
+            self._timer.start(int(delay * 1000) + 1)
+
+    def stats_text(self):
+        return f"sent {self.sent} pages, dropped {self.dropped}, merged {self.merged}, queued {len(self._queue)}"
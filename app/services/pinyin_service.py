@@ -0,0 +1,51 @@
+# app/services/pinyin_service.py
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pinyin")
+_warm_lock = threading.Lock()
+_warmed = False
+
+
+def _convert(text):
+    # pypinyin 体积较大，首次调用时才 import (warm_up 会在后台提前完成)
+    from pypinyin import pinyin, Style
+    pinyin_list = pinyin(text, style=Style.NORMAL)
+    raw = " ".join([item[0] for item in pinyin_list])
+    return re.sub(r'\s+([^\w\s])', r'\1', raw)
+
+
+@lru_cache(maxsize=2048)
+def to_pinyin(text):
+    """带 LRU 缓存的拼音转换 (口头禅 / 重复短句不再重新分词)"""
+    if not text: return ""
+    return _convert(text)
+
+
+def submit(text):
+    """在拼音线程上转换，返回 Future；翻译线程可同时发出请求"""
+    return _executor.submit(to_pinyin, text)
+
+
+def warm_up(background=True):
+    """预加载 pypinyin 的字典与分词器，避免第一句话承担加载耗时"""
+    def _warm():
+        global _warmed
+        with _warm_lock:
+            if _warmed: return
+            t0 = time.perf_counter()
+            try:
+                _convert("预热拼音词典，重庆银行行长")
+            except Exception as e:
+                print(f"Pinyin warm-up failed: {e}")
+                return
+            _warmed = True
+            print(f"Pinyin dictionaries loaded in {(time.perf_counter() - t0) * 1000:.0f}ms")
+
+    if background:
+        _executor.submit(_warm)
+    else:
+        _warm()
@@ -0,0 +1,322 @@
+# app/services/providers.py
+import json
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from app.services.json_stream import IncrementalJSONFieldParser, iter_sse_content
+
+
+@dataclass(frozen=True)
+class Provider:
+    """一个 OpenAI 兼容的 chat/completions 服务"""
+    name: str
+    api_base: str
+    api_key: str
+    model: str
+
+    @property
+    def url(self):
+        return f"{self.api_base.rstrip('/')}/chat/completions"
+
+
+def load_providers(cfg):
+    """
+    主服务商来自设置界面 (api_base / api_key / model)，
+    trans_providers 按顺序追加备用服务商: [{"name", "api_base", "api_key", "model"}, ...]
+    """
+    providers = []
+    if cfg.get("api_key"):
+        providers.append(Provider("primary", cfg.get("api_base"), cfg.get("api_key"), cfg.get("model")))
+    for i, item in enumerate(cfg.get("trans_providers") or []):
+        if not isinstance(item, dict) or not item.get("api_key") or not item.get("api_base"):
+            continue
+        providers.append(Provider(
+            item.get("name") or f"backup{i + 1}",
+            item["api_base"], item["api_key"], item.get("model") or cfg.get("model"),
+        ))
+    return providers
+
+
+class LatencyTracker:
+    """按服务商记录最近 N 次成功请求的耗时，用于计算对冲等待时间 (p90)"""
+
+    def __init__(self, window=50, min_samples=5):
+        self.min_samples = min_samples
+        self._samples = {}
+        self._window = window
+        self._lock = threading.Lock()
+        self.failures = {}
+        self.wins = {}
+
+    def record(self, name, elapsed_ms):
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self._window)).append(elapsed_ms)
+
+    def record_failure(self, name):
+        with self._lock:
+            self.failures[name] = self.failures.get(name, 0) + 1
+
+    def record_win(self, name):
+        with self._lock:
+            self.wins[name] = self.wins.get(name, 0) + 1
+
+    def percentile(self, name, q=0.9):
+        """样本不足时返回 None"""
+        with self._lock:
+            samples = sorted(self._samples.get(name) or ())
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def stats_text(self):
+        parts = []
+        for name in sorted(set(self._samples) | set(self.failures) | set(self.wins)):
+            p90 = self.percentile(name)
+            p90 = f"{p90:.0f}ms" if p90 is not None else "n/a"
+            parts.append(f"{name}: p90={p90} wins={self.wins.get(name, 0)} fail={self.failures.get(name, 0)}")
+        return "; ".join(parts)
+
+
+def cached_prompt_tokens(usage):
+    """各家 usage 中命中前缀缓存的 token 数：DeepSeek prompt_cache_hit_tokens / OpenAI prompt_tokens_details.cached_tokens"""
+    if "prompt_cache_hit_tokens" in usage:
+        return usage.get("prompt_cache_hit_tokens") or 0
+    details = usage.get("prompt_tokens_details") or {}
+    return details.get("cached_tokens") or 0
+
+
+class UsageStats:
+    """按服务商汇总本次会话的 token 用量、前缀缓存命中与耗时"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, name, usage, elapsed_ms):
+        prompt = usage.get("prompt_tokens") or 0
+        cached = cached_prompt_tokens(usage)
+        with self._lock:
+            t = self._totals.setdefault(name, {"requests": 0, "prompt": 0, "cached": 0, "completion": 0,
+                                               "ms": 0.0, "cached_ms": 0.0, "cached_requests": 0})
+            t["requests"] += 1
+            t["prompt"] += prompt
+            t["cached"] += cached
+            t["completion"] += usage.get("completion_tokens") or 0
+            t["ms"] += elapsed_ms
+            if cached:
+                t["cached_requests"] += 1
+                t["cached_ms"] += elapsed_ms
+
+    def stats_text(self):
+        parts = []
+        with self._lock:
+            items = [(name, dict(t)) for name, t in self._totals.items()]
+        for name, t in items:
+            ratio = t["cached"] / t["prompt"] if t["prompt"] else 0.0
+            avg = t["ms"] / t["requests"] if t["requests"] else 0.0
+            uncached = t["requests"] - t["cached_requests"]
+            hit_ms = f"{t['cached_ms'] / t['cached_requests']:.0f}ms" if t["cached_requests"] else "n/a"
+            miss_ms = f"{(t['ms'] - t['cached_ms']) / uncached:.0f}ms" if uncached else "n/a"
+            parts.append(f"{name}: {t['requests']} req, prompt {t['prompt']} tok (cached {ratio:.0%}), "
+                         f"completion {t['completion']} tok, avg {avg:.0f}ms (cache hit {hit_ms} / miss {miss_ms})")
+        return "; ".join(parts)
+
+
+class _Attempt:
+    def __init__(self, index, provider):
+        self.index = index
+        self.provider = provider
+        self.resp = None
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        resp = self.resp
+        if resp is not None:
+            try: resp.close()
+            except Exception: pass
+
+
+class HedgedRequest:
+    """
+    对冲请求 (Hedged Request)
+
+    先向主服务商发请求；若超过其 p90 耗时仍未返回 (或已失败)，再向下一个服务商发同样的请求，
+    先返回有效 JSON 的一方胜出，其余请求被取消。超过总截止时间仍无结果则放弃 (由调用方回退到原文)。
+    流式字段只转发给最先产生输出的请求，避免两路结果在界面上交替闪烁。
+    """
+
+    def __init__(self, http, tracker, providers, build_payload, requested,
+                 hedge_default_ms=1500, hedge_min_ms=300, deadline_ms=6000, stream=False, on_field=None,
+                 usage=None, stream_usage=True):
+        self.http = http
+        self.tracker = tracker
+        self.usage = usage
+        self.stream_usage = stream_usage
+        self.providers = providers
+        self.build_payload = build_payload
+        self.requested = requested
+        self.hedge_default_ms = hedge_default_ms
+        self.hedge_min_ms = hedge_min_ms
+        self.deadline_ms = deadline_ms
+        self.stream = stream
+        self.on_field = on_field
+        self.errors = []
+        self.hedged = False
+        self.timed_out = False
+        self._attempts = []
+        self._leader = None
+        self._done = False  # 已决出结果 (或放弃)：之后不再转发任何流式字段
+        self._lock = threading.Lock()
+        self._results = queue.Queue()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        for attempt in list(self._attempts):
+            attempt.cancel()
+        self._results.put(("cancel", None, None))
+
+    def _hedge_delay(self, provider):
+        p90 = self.tracker.percentile(provider.name)
+        delay = self.hedge_default_ms if p90 is None else p90
+        return max(self.hedge_min_ms, delay) / 1000
+
+    def run(self):
+        """返回 (fields, provider)；全部失败 / 超时 / 被取消时返回 (None, None)"""
+        if not self.providers:
+            return None, None
+        start = time.monotonic()
+        deadline = start + self.deadline_ms / 1000 if self.deadline_ms > 0 else None
+        next_index = 0
+        pending = 0
+        next_hedge_at = None
+
+        def launch():
+            nonlocal next_index, pending, next_hedge_at
+            provider = self.providers[next_index]
+            attempt = _Attempt(next_index, provider)
+            self._attempts.append(attempt)
+            threading.Thread(target=self._execute, args=(attempt,), daemon=True).start()
+            next_index += 1
+            pending += 1
+            next_hedge_at = time.monotonic() + self._hedge_delay(provider)
+
+        launch()
+        try:
+            while not self.cancelled:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    self.timed_out = True
+                    return None, None
+                waits = [t - now for t in (deadline,) if t is not None]
+                if next_index < len(self.providers):
+                    waits.append(next_hedge_at - now)
+                try:
+                    kind, attempt, fields = self._results.get(timeout=max(0.0, min(waits)) if waits else None)
+                except queue.Empty:
+                    if next_index < len(self.providers) and time.monotonic() >= next_hedge_at:
+                        self.hedged = True
+                        launch()
+                    continue
+
+                if kind == "cancel":
+                    return None, None
+                pending -= 1
+                if kind == "ok":
+                    with self._lock:
+                        self._done = True
+                    self.tracker.record_win(attempt.provider.name)
+                    return fields, attempt.provider
+                self.errors.append(f"{attempt.provider.name}: {fields}")
+                # 当前请求已失败，无需等到 p90 再对冲
+                if pending == 0:
+                    if next_index >= len(self.providers):
+                        return None, None
+                    launch()
+            return None, None
+        finally:
+            with self._lock:
+                self._done = True
+            for attempt in self._attempts:
+                attempt.cancel()
+
+    def _execute(self, attempt):
+        provider = attempt.provider
+        t0 = time.perf_counter()
+        try:
+            payload = self.build_payload(provider)
+            if self.stream:
+                payload["stream"] = True
+                if self.stream_usage:
+                    payload["stream_options"] = {"include_usage": True}
+            headers = {"Authorization": f"Bearer {provider.api_key}", "Content-Type": "application/json"}
+            timeout = self.deadline_ms / 1000 if self.deadline_ms > 0 else 10
+            # 总是以流模式收取响应体：响应头到达后即可被 cancel() 关闭连接，
+            # 非流式请求也不会在取消后继续下载完整的响应体
+            resp = attempt.resp = self.http.post(provider.url, headers=headers, json=payload,
+                                                 timeout=timeout, stream=True)
+            usage = {}
+            try:
+                if attempt.cancelled:
+                    return
+                if resp.status_code != 200:
+                    raise ValueError(f"HTTP {resp.status_code}")
+                if "event-stream" in resp.headers.get("content-type", ""):
+                    fields = self._read_stream(attempt, resp, usage)
+                else:
+                    body = json.loads(resp.read() if hasattr(resp, "read") else resp.content)
+                    usage.update(body.get("usage") or {})
+                    fields = self._read_json(body)
+            finally:
+                attempt.resp = None
+                resp.close()
+            if attempt.cancelled:
+                return
+            if not any(fields.get(k) for k in self.requested):
+                raise ValueError("no translated fields in response")
+        except Exception as e:
+            if attempt.cancelled:
+                return
+            self.tracker.record_failure(provider.name)
+            self._results.put(("error", attempt, str(e)))
+            return
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        self.tracker.record(provider.name, elapsed_ms)
+        if self.usage is not None and usage:
+            self.usage.record(provider.name, usage, elapsed_ms)
+        self._results.put(("ok", attempt, fields))
+
+    @staticmethod
+    def _read_json(body):
+        content = body['choices'][0]['message']['content']
+        return {k: v for k, v in json.loads(content).items() if v}
+
+    def _read_stream(self, attempt, resp, usage=None):
+        parser = IncrementalJSONFieldParser()
+        fields = {}
+        lines = resp.iter_lines()
+        for delta in iter_sse_content(lines, usage):
+            if attempt.cancelled:
+                break
+            for k, v in parser.feed(delta):
+                if not v: continue
+                fields[k] = v
+                if self.on_field is None:
+                    continue
+                # 在锁内判断并回调：胜出方确定后，落败的领先请求不会再推送中间结果
+                with self._lock:
+                    if self._done:
+                        continue
+                    if self._leader is None:
+                        self._leader = attempt.index
+                    if self._leader == attempt.index:
+                        self.on_field(k, v)
+        if not attempt.cancelled:
+            # [DONE] 之后还有 chunked 结束标记：读完整个响应体，连接才会回到连接池而不是被关闭
+            for _ in lines:
+                pass
+        return fields
@@ -0,0 +1,150 @@
+# app/services/sound_cues.py
+import io
+import queue
+import sys
+import threading
+import wave
+
+import numpy as np
+
+CUE_RATE = 22050
+# 名称 -> (频率 Hz, 时长 ms)，与原来的 winsound.Beep 参数一致
+CUES = {
+    "rec_start": (800, 100),
+    "rec_stop": (500, 100),
+    "osc_sent": (1000, 100),
+}
+
+
+def _tone(freq, duration_ms, rate=CUE_RATE, volume=0.4):
+    """正弦波 int16 PCM，首尾 5ms 淡入淡出避免爆音"""
+    n = int(rate * duration_ms / 1000)
+    t = np.arange(n) / rate
+    wave_data = np.sin(2 * np.pi * freq * t) * volume
+    fade = min(n // 2, int(rate * 0.005))
+    if fade:
+        ramp = np.linspace(0.0, 1.0, fade)
+        wave_data[:fade] *= ramp
+        wave_data[-fade:] *= ramp[::-1]
+    return (wave_data * 32767).astype(np.int16).tobytes()
+
+
+def _to_wav(pcm, rate=CUE_RATE):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm)
+    return buf.getvalue()
+
+
+class CuePlayer:
+    """
+    提示音播放器
+    提示音在构造时预先生成为 PCM；play() 只把名称放入队列立即返回，
+    由独立线程写入常驻的 PyAudio 输出流 (Windows 上打不开输出流时回退到 winsound 内存 WAV)。
+    录音开始 / OSC 发送不再被 100ms 的 Beep 阻塞。
+    """
+
+    def __init__(self, cues=CUES):
+        self._pcm = {name: _tone(freq, ms) for name, (freq, ms) in cues.items()}
+        self._wav = {}
+        self._queue = queue.Queue()
+        self._pa = None
+        self._stream = None
+        self._backend = None
+        self._thread = threading.Thread(target=self._run, name="sound-cues", daemon=True)
+        self._thread.start()
+
+    def play(self, name):
+        if name in self._pcm:
+            self._queue.put(name)
+
+    def _open(self):
+        """在播放线程上打开输出设备 (不占用调用方线程)"""
+        try:
+            import pyaudio
+            self._pa = pyaudio.PyAudio()
+            self._stream = self._pa.open(format=pyaudio.paInt16, channels=1, rate=CUE_RATE, output=True)
+            self._backend = "pyaudio"
+            return
+        except Exception as e:
+            print(f"Sound cue output stream unavailable: {e}")
+            if self._pa is not None:
+                self._pa.terminate()
+                self._pa = None
+        if sys.platform == "win32":
+            self._wav = {name: _to_wav(pcm) for name, pcm in self._pcm.items()}
+            self._backend = "winsound"
+        else:
+            self._backend = "none"
+
+    def _run(self):
+        self._open()
+        while True:
+            name = self._queue.get()
+            if name is None:
+                break
+            # 积压时只播放最新的提示音
+            while not self._queue.empty():
+                nxt = self._queue.get()
+                if nxt is None:
+                    return self._close()
+                name = nxt
+            try:
+                if self._backend == "pyaudio":
+                    self._stream.write(self._pcm[name])
+                elif self._backend == "winsound":
+                    import winsound
+                    winsound.PlaySound(self._wav[name], winsound.SND_MEMORY)
+            except Exception as e:
+                print(f"Sound cue error: {e}")
+        self._close()
+
+    def _close(self):
+        if self._stream is not None:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception:
+                pass
+            self._stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=1)
+
+
+_player = None
+_player_lock = threading.Lock()
+
+
+def _get_player():
+    global _player
+    if _player is None:
+        with _player_lock:
+            if _player is None:
+                _player = CuePlayer()
+    return _player
+
+
+def warm_up():
+    """启动时预先生成提示音并在后台打开输出设备，第一次提示音不承担打开耗时"""
+    _get_player()
+
+
+def play(name):
+    """异步播放提示音 (rec_start / rec_stop / osc_sent)，任何线程均可调用"""
+    _get_player().play(name)
+
+
+def shutdown():
+    global _player
+    with _player_lock:
+        if _player is not None:
+            _player.close()
+            _player = None
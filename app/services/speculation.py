@@ -0,0 +1,126 @@
+# app/services/speculation.py
+import time
+
+from app.core.text_norm import normalize_text
+
+SPEC_HIT = "hit"
+SPEC_MISS = "miss"
+SPEC_NONE = "none"
+
+
+class SpeculationTracker:
+    """
+    投机翻译 (Speculative Translation)
+
+    最终识别结果出来之前，用足够稳定的中间文本 (双通道预览) 提前开始翻译：
+    - 最终文本归一化后与中间文本一致 -> 直接沿用其翻译 (hit)
+    - 不一致 -> 取消投机请求 (miss)，由调用方重新翻译最终文本
+    投机结果在最终文本确认前只暂存、不外发；已确认但尚未返回的请求会一直保留到结果送达，
+    不会被下一句的投机翻译取消。统计命中率与节省的时间，用于调整稳定度阈值。
+    """
+
+    def __init__(self, translator, min_stability=0.0, min_chars=2):
+        self.translator = translator
+        self.min_stability = min_stability
+        self.min_chars = min_chars
+        self._spec = None
+        self._awaiting = {}  # req_id -> 已确认、等待结果的投机请求
+        self.proposed = 0
+        self.skipped = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+
+    # === 状态 ===
+    def is_spec(self, req_id):
+        return req_id in self._awaiting or (self._spec is not None and req_id == self._spec["req"])
+
+    def is_confirmed(self, req_id):
+        return req_id in self._awaiting
+
+    @property
+    def pending_req(self):
+        """当前尚未确认的投机请求 ID (没有时为 None)"""
+        return self._spec["req"] if self._spec is not None else None
+
+    @property
+    def hit_rate(self):
+        decided = self.hits + self.misses
+        return self.hits / decided if decided else 0.0
+
+    def stats_text(self):
+        avg = self.saved_ms / self.hits if self.hits else 0.0
+        return (f"hit {self.hits}/{self.hits + self.misses} ({self.hit_rate:.0%}), "
+                f"skipped {self.skipped}, saved avg {avg:.0f}ms / total {self.saved_ms / 1000:.1f}s")
+
+    # === 流程 ===
+    def propose(self, text, stability=None):
+        """中间文本到达：稳定度足够时开始投机翻译，返回请求 ID (未开始返回 None)"""
+        norm = normalize_text(text)
+        if len(norm) < self.min_chars or (stability is not None and stability < self.min_stability):
+            self.skipped += 1
+            return None
+        if self._spec is not None and self._spec["norm"] == norm:
+            return self._spec["req"]
+
+        self.discard()
+        self.proposed += 1
+        req = self.translator.process(text, speculative=True)
+        self._spec = {"req": req, "norm": norm, "result": None,
+                      "started": time.perf_counter(), "final_at": None, "done_at": None}
+        return req
+
+    def resolve(self, final_text):
+        """
+        最终文本到达
+        :return: (状态, 结果)。状态为 hit / miss / none；hit 且翻译已完成时结果为 (osc, disp)
+        """
+        spec = self._spec
+        if spec is None:
+            return SPEC_NONE, None
+
+        if spec["norm"] != normalize_text(final_text):
+            self.misses += 1
+            self.discard()
+            return SPEC_MISS, None
+
+        self.hits += 1
+        self._spec = None
+        spec["final_at"] = time.perf_counter()
+        result = spec["result"]
+        if result is not None:
+            self._finish(spec)
+        else:
+            self._awaiting[spec["req"]] = spec
+        return SPEC_HIT, result
+
+    def on_done(self, req_id, osc_msg, disp_msg):
+        """
+        投机请求完成
+        :return: True 表示应立即应用 (最终文本已确认)；False 表示已暂存或不属于投机请求
+        """
+        spec = self._awaiting.pop(req_id, None)
+        if spec is not None:
+            spec["done_at"] = time.perf_counter()
+            self._finish(spec)
+            return True
+        spec = self._spec
+        if spec is None or req_id != spec["req"]:
+            return False
+        spec["done_at"] = time.perf_counter()
+        spec["result"] = (osc_msg, disp_msg)
+        return False
+
+    def discard(self):
+        """放弃当前未确认的投机请求 (未命中 / 新的一句话开始)；已确认的请求不受影响"""
+        spec, self._spec = self._spec, None
+        if spec is not None and spec["result"] is None:
+            self.translator.cancel(spec["req"])
+
+    def _finish(self, spec):
+        # 节省的时间 = 翻译在最终文本到达前已经进行的时长 (已完成则为整个翻译耗时)
+        end = min(t for t in (spec["final_at"], spec["done_at"]) if t is not None)
+        saved = max(0.0, (end - spec["started"]) * 1000)
+        self.saved_ms += saved
+        spec["saved_ms"] = saved
+        print(f"Speculative translation: +{saved:.0f}ms [{self.stats_text()}]")
@@ -0,0 +1,65 @@
+# app/services/template.py
+import re
+from functools import lru_cache
+
+# 模板中可用的占位符；其它 {xxx} 原样保留
+TEMPLATE_FIELDS = ("text", "zh", "pinyin", "en", "ja", "ru")
+
+_PLACEHOLDER = re.compile(r"\{(" + "|".join(TEMPLATE_FIELDS) + r")\}")
+
+
+class CompiledTemplate:
+    """
+    预编译模板：解析一次得到 [文本, 字段, 文本, 字段, ...]，渲染时单次拼接。
+    模板中字面量 "\\n" 在编译时转换为换行。
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self._literals = []
+        self._fields = []
+        pos = 0
+        for m in _PLACEHOLDER.finditer(source):
+            self._literals.append(source[pos:m.start()].replace("\\n", "\n"))
+            self._fields.append(m.group(1))
+            pos = m.end()
+        self._literals.append(source[pos:].replace("\\n", "\n"))
+        self.fields = frozenset(self._fields)
+
+    def render(self, values):
+        out = [self._literals[0]]
+        for field, literal in zip(self._fields, self._literals[1:]):
+            out.append(str(values.get(field, "")))
+            out.append(literal)
+        return "".join(out)
+
+
+class DisplayTemplate:
+    """悬浮窗 / VR 面板模板：逐行编译，引用了空字段 ({text} 除外) 的行整行省略"""
+
+    def __init__(self, source):
+        self.lines = [CompiledTemplate(line) for line in source.split("\n")]
+        self.fields = frozenset().union(*(line.fields for line in self.lines))
+
+    def render(self, values):
+        kept = [line.render(values) for line in self.lines
+                if all(values.get(f) or f == "text" for f in line.fields)]
+        return "\n".join(kept)
+
+
+class TemplateSet:
+    """tpl_osc + tpl_display 的编译结果；fields 为两者实际引用到的字段"""
+
+    def __init__(self, tpl_osc, tpl_display):
+        self.osc = CompiledTemplate(tpl_osc or "")
+        self.display = DisplayTemplate(tpl_display or "")
+        self.fields = self.osc.fields | self.display.fields
+
+    def render(self, values):
+        return self.osc.render(values), self.display.render(values)
+
+
+@lru_cache(maxsize=8)
+def compile_templates(tpl_osc, tpl_display):
+    """模板字符串不变时直接复用编译结果 (设置保存后自然失效)"""
+    return TemplateSet(tpl_osc, tpl_display)
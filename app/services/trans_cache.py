@@ -0,0 +1,224 @@
+# app/services/trans_cache.py
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from difflib import SequenceMatcher
+
+from app.config import TRANS_CACHE_FILE
+from app.core.text_norm import normalize_text
+
+# 归一化后短于该长度的文本只做精确匹配 ("ok" 与 "oh" 不能互相命中)
+MIN_FUZZY_LEN = 4
+# 命中次数先累积在内存中，攒够一批 (或写入新条目 / 关闭时) 再一次提交
+HIT_FLUSH_BATCH = 64
+
+# 否定词与数字决定句意：两句在这些标记上不一致时不允许模糊命中 ("我不想去" != "我想去")
+# 在归一化文本 (已去掉空白) 上按子串计数，误判只会让匹配更保守
+_NEGATION = re.compile(r"不|没|沒|别|別|无|無|非|未|勿|莫|ない|ません|не|нет|never|not|dont|cant|wont|no")
+_DIGITS = re.compile(r"\d+")
+
+
+def _meaning_markers(text):
+    return sorted(_NEGATION.findall(text)), _DIGITS.findall(text)
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TranslationMemory:
+    """
+    翻译记忆缓存 (Translation Memory)
+
+    key = 归一化原文 + 启用的语言集合 + 模型名
+    - 内存 LRU：热点短语零 IO
+    - SQLite (settings.json 同目录)：跨会话持久化
+    - 字符 trigram 倒排索引 + 编辑相似度：命中近似重复的句子 (fuzzy_threshold > 0 时开启，默认关闭)；
+      否定词或数字不同的句子不会模糊命中
+    """
+
+    def __init__(self, path=TRANS_CACHE_FILE, capacity=512, fuzzy_threshold=0.0, index_limit=5000):
+        self.capacity = capacity
+        self.fuzzy_threshold = fuzzy_threshold
+        self.index_limit = index_limit
+        self._lru = OrderedDict()
+        self._lock = threading.RLock()
+        # 模糊索引：namespace -> {norm_text: trigram set} 与 trigram -> {norm_text}
+        self._entries = defaultdict(dict)
+        self._postings = defaultdict(lambda: defaultdict(set))
+        self.hits = {"memory": 0, "disk": 0, "fuzzy": 0}
+        self.misses = 0
+        self._pending_hits = {}  # (ns, src) -> (次数, last_used)，延迟写入 SQLite
+
+        self._db = None
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tm ("
+                " ns TEXT NOT NULL, src TEXT NOT NULL, fields TEXT NOT NULL,"
+                " hits INTEGER DEFAULT 0, last_used REAL,"
+                " PRIMARY KEY (ns, src))"
+            )
+            self._db.commit()
+            if self.fuzzy_threshold:
+                self._load_index()
+        except sqlite3.Error as e:
+            print(f"Translation cache disabled on disk: {e}")
+            self._db = None
+
+    @staticmethod
+    def namespace(langs, model):
+        return f"{model}|{','.join(sorted(langs))}"
+
+    # === 查询 ===
+    def lookup(self, text, langs, model):
+        """返回 (fields, kind)；未命中返回 (None, None)。kind 为 memory / disk / fuzzy"""
+        src = normalize_text(text)
+        if not src:
+            return None, None
+        ns = self.namespace(langs, model)
+        key = (ns, src)
+
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return self._hit(key, self._lru[key], "memory")
+
+            fields = self._db_get(ns, src)
+            if fields is not None:
+                self._remember(key, fields)
+                return self._hit(key, fields, "disk")
+
+            match = self._fuzzy_match(ns, src)
+            if match is not None:
+                fields = self._lru.get((ns, match)) or self._db_get(ns, match)
+                if fields is not None:
+                    return self._hit((ns, match), fields, "fuzzy")
+
+            self.misses += 1
+        return None, None
+
+    def _hit(self, key, fields, kind):
+        # 命中计数不在翻译线程上逐次提交 (每次 commit 都是一次磁盘同步)
+        self.hits[kind] += 1
+        count, _ = self._pending_hits.get(key, (0, 0.0))
+        self._pending_hits[key] = (count + 1, time.time())
+        if len(self._pending_hits) >= HIT_FLUSH_BATCH:
+            self._flush_hits()
+            self._commit()
+        return dict(fields), kind
+
+    def _flush_hits(self):
+        """把累积的命中次数写入当前事务 (调用方持有锁并负责提交)"""
+        pending, self._pending_hits = self._pending_hits, {}
+        if self._db is None or not pending:
+            return
+        try:
+            self._db.executemany(
+                "UPDATE tm SET hits = hits + ?, last_used = ? WHERE ns = ? AND src = ?",
+                [(count, used, ns, src) for (ns, src), (count, used) in pending.items()]
+            )
+        except sqlite3.Error:
+            pass
+
+    def _commit(self):
+        if self._db is None:
+            return
+        try:
+            self._db.commit()
+        except sqlite3.Error:
+            pass
+
+    def _fuzzy_match(self, ns, src):
+        if not self.fuzzy_threshold or len(src) < MIN_FUZZY_LEN or ns not in self._entries:
+            return None
+        markers = _meaning_markers(src)
+        grams = _trigrams(src)
+        postings = self._postings[ns]
+        counts = defaultdict(int)
+        for g in grams:
+            for cand in postings.get(g, ()):
+                counts[cand] += 1
+
+        best, best_score = None, self.fuzzy_threshold
+        entries = self._entries[ns]
+        for cand, shared in counts.items():
+            # 先用 trigram Jaccard 上界快速剪枝，再用编辑相似度确认
+            jaccard = shared / (len(grams) + len(entries[cand]) - shared)
+            if jaccard < self.fuzzy_threshold * 0.5:
+                continue
+            if _meaning_markers(cand) != markers:
+                continue
+            score = SequenceMatcher(None, src, cand).ratio()
+            if score >= best_score:
+                best, best_score = cand, score
+        return best
+
+    # === 写入 ===
+    def store(self, text, langs, model, fields):
+        src = normalize_text(text)
+        if not src or not fields:
+            return
+        ns = self.namespace(langs, model)
+        with self._lock:
+            self._remember((ns, src), fields)
+            self._index(ns, src)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO tm (ns, src, fields, hits, last_used) VALUES (?, ?, ?, "
+                        "COALESCE((SELECT hits FROM tm WHERE ns = ? AND src = ?), 0), ?)",
+                        (ns, src, json.dumps(fields, ensure_ascii=False), ns, src, time.time())
+                    )
+                    self._flush_hits()
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Translation cache write failed: {e}")
+
+    def _remember(self, key, fields):
+        self._lru[key] = dict(fields)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def _index(self, ns, src):
+        if not self.fuzzy_threshold or len(src) < MIN_FUZZY_LEN or src in self._entries[ns]:
+            return
+        grams = _trigrams(src)
+        self._entries[ns][src] = grams
+        for g in grams:
+            self._postings[ns][g].add(src)
+
+    def _db_get(self, ns, src):
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute("SELECT fields FROM tm WHERE ns = ? AND src = ?", (ns, src)).fetchone()
+        except sqlite3.Error:
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _load_index(self):
+        """启动时载入最近使用的条目建立模糊索引"""
+        rows = self._db.execute(
+            "SELECT ns, src FROM tm ORDER BY last_used DESC LIMIT ?", (self.index_limit,)
+        ).fetchall()
+        for ns, src in rows:
+            self._index(ns, src)
+
+    def stats_text(self):
+        total = sum(self.hits.values())
+        return (f"hits={total} (mem {self.hits['memory']}, disk {self.hits['disk']}, fuzzy {self.hits['fuzzy']}), "
+                f"misses={self.misses}")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._flush_hits()
+                self._commit()
+                self._db.close()
+                self._db = None
@@ -1,143 +1,440 @@
-import json
-import requests
-import winsound
-import re
+import time
+import threading
 import traceback
-from pythonosc import udp_client
-from pypinyin import pinyin, Style
-from PySide6.QtCore import QObject, Signal, QThread, QRunnable, QThreadPool
+from collections import deque
+from PySide6.QtCore import QObject, Signal, QThread, QRunnable, QThreadPool, QTimer
+
+from app.services.http_client import PooledHttpClient
+from app.services.trans_cache import TranslationMemory
+from app.services.providers import LatencyTracker, UsageStats
+from app.services.template import compile_templates
+from app.services import pinyin_service, sound_cues
+from app.services.trivial_input import TrivialInputClassifier
+from app.services.osc_scheduler import ChatboxScheduler
+from app.services.osc_output import OscFanout
+from app.core.interfaces import TranslationJob
+from app.plugins.translation import TARGET_LANGS, DEFAULT_ENGINE, create_translation_engine
+
+# 修改后需要重建本地翻译引擎的设置项
+LOCAL_ENGINE_KEYS = (
+    "trans_local_model", "trans_local_device", "trans_local_compute_type",
+    "trans_local_beam_size", "trans_local_cpu_threads",
+)
 
 class TranslationWorker(QRunnable):
     """
-    使用 QRunnable 放入线程池执行 API 请求
+    使用 QRunnable 放入线程池执行翻译 (具体实现由 ITranslationEngine 提供)
     """
-    def __init__(self, text, config, lang_service, callbacks):
+    def __init__(self, text, config, lang_service, callbacks, req_id=0, engine=None, memory=None, trivial=None):
         super().__init__()
         self.text = text
+        self.req_id = req_id
+        self.engine = engine
+        self.memory = memory
+        self.trivial = trivial
         self.cfg = config
         self.ls = lang_service
         self.finished_signal = callbacks['finished']
+        self.partial_signal = callbacks.get('partial')
         self.log_signal = callbacks['log']
+        self.job = TranslationJob()
+        self.templates = None
+        self.data_map = None
+        self.requested = []
+        self.cache_key = None
+        self._pinyin = None
+        self.speculative = False
+        # 由 TranslationService 持有引用以便取消，不交给 Qt 自动析构
+        self.setAutoDelete(False)
+
+    @property
+    def cancelled(self):
+        return self.job.cancelled
+
+    def cancel(self):
+        """取消请求：关闭进行中的 HTTP 响应 (包括对冲请求)，结果不再回传"""
+        self.job.cancel()
 
-    def _get_pinyin(self, text):
-        if not text: return ""
-        pinyin_list = pinyin(text, style=Style.NORMAL)
-        raw = " ".join([item[0] for item in pinyin_list])
-        return re.sub(r'\s+([^\w\s])', r'\1', raw)
+    def _fill_pinyin(self, data_map):
+        if self._pinyin is not None and not data_map["pinyin"]:
+            try:
+                data_map["pinyin"] = self._pinyin.result()
+            except Exception as e:
+                print(f"Pinyin failed: {e}")
+            self._pinyin = None
+
+    def _reset_fields(self, data_map):
+        for k in TARGET_LANGS:
+            data_map[k] = self.text if k == "zh" else ""
 
     def run(self):
+        if self.cancelled: return
         try:
-            langs = self.cfg.get("langs")
-            pinyin_text = self._get_pinyin(self.text) if langs.get("pinyin") else ""
-            
-            data_map = {
-                "text": self.text, "zh": self.text,
-                "pinyin": pinyin_text,
-                "en": "", "ja": "", "ru": "" 
-            }
-
-            json_fields = []
-            if langs.get("zh"): json_fields.append('"zh": "Chinese Translation"')
-            if langs.get("en"): json_fields.append('"en": "English Translation"')
-            if langs.get("ja"): json_fields.append('"ja": "Japanese Translation"')
-            if langs.get("ru"): json_fields.append('"ru": "Russian Translation"')
-            
-            if not json_fields: json_fields.append('"en": "English Translation"')
-
-            system_prompt = (
-                "You are a translation engine for VRChat. "
-                "Translate the input strictly into JSON. No markdown. "
-                "Format:\n{\n" + ",\n".join(json_fields) + "\n}"
-            )
+            if not self.prepare(): return
+            if self.cancelled: return
+
+            data_map = self.data_map
+
+            def on_field(k, v):
+                data_map[k] = v
+                if self.partial_signal is not None and not self.cancelled:
+                    osc_msg, disp_msg = self._render(data_map)
+                    self.partial_signal.emit(self.req_id, k, osc_msg, disp_msg)
+
+            t0 = time.perf_counter()
+            result = self.engine.translate(self.text, self.requested, job=self.job, on_field=on_field)
+            self.complete(result, (time.perf_counter() - t0) * 1000)
+        except Exception as e:
+            self.fail(e)
+
+    def prepare(self):
+        """
+        本地可完成的步骤 (模板 / 拼音 / 快速通道 / 翻译记忆)
+        :return: True 表示还需要调用翻译引擎；False 表示结果已发出
+        """
+        langs = self.cfg.get("langs")
+        self.templates = compile_templates(self.cfg.get("tpl_osc"), self.cfg.get("tpl_display"))
+        needed = self.templates.fields
+
+        # 只计算 / 请求模板实际引用到的字段
+        # 拼音在独立线程上与翻译请求并行计算，渲染前再取结果
+        want_pinyin = "pinyin" in needed and langs.get("pinyin", True)
+        self._pinyin = pinyin_service.submit(self.text) if want_pinyin else None
+        
+        data_map = self.data_map = {
+            "text": self.text, "zh": self.text,
+            "pinyin": "",
+            "en": "", "ja": "", "ru": "" 
+        }
+
+        enabled = [k for k in TARGET_LANGS if langs.get(k)] or ["en"]
+        requested = self.requested = [k for k in enabled if k in needed]
+        if not requested:
+            self._emit(data_map)
+            return False
+
+        # 数字 / 表情 / 口头语 / 已是目标语言：本地直接给出结果
+        if self.trivial is not None:
+            fields, reason = self.trivial.classify(self.text, requested)
+            if fields is not None:
+                data_map.update(fields)
+                self.log_signal.emit(self.ls.tr("log_trivial_skip").format(reason))
+                self._emit(data_map)
+                return False
+
+        engine = self.engine
+        if engine is None or not engine.is_ready():
+            # 远程引擎未就绪 = 没有配置 API Key；本地引擎未就绪 = 模型仍在加载或加载失败
+            remote = (self.cfg.get("trans_engine") or DEFAULT_ENGINE) == DEFAULT_ENGINE
+            data_map["en"] = self.ls.tr("err_no_api_key" if remote else "err_trans_engine_not_ready")
+            self._emit(data_map)
+            return False
+        self.cache_key = engine.cache_key
+
+        # 翻译记忆：命中时直接渲染，不调用翻译引擎
+        if self.memory is not None:
+            cached, kind = self.memory.lookup(self.text, requested, self.cache_key)
+            if cached is not None:
+                data_map.update(cached)
+                self.log_signal.emit(self.ls.tr("log_cache_hit").format(kind))
+                self._emit(data_map)
+                return False
+        return True
+
+    def complete(self, result, elapsed_ms):
+        """处理翻译引擎的结果并发出 finished"""
+        if self.cancelled: return
+        data_map = self.data_map
+
+        if not result:
+            # 所有服务商失败或超过截止时间：直接发送原文，不让用户空等
+            for err in result.errors:
+                self.log_signal.emit(self.ls.tr("err_trans_provider").format(err))
+            if result.timed_out:
+                self.log_signal.emit(self.ls.tr("log_trans_deadline").format(elapsed_ms / 1000))
+            self._reset_fields(data_map)
+            _, disp_msg = self._render(data_map)
+            self.finished_signal.emit(self.req_id, self.text, disp_msg)
+            return
+
+        # 丢弃落败请求可能已流式写入的字段，只保留胜出方的结果
+        self._reset_fields(data_map)
+        data_map.update(result.fields)
+        self._remember(self.requested, self.cache_key, data_map)
+        if result.hedged:
+            self.log_signal.emit(self.ls.tr("log_trans_hedged").format(result.source))
+        stats = self.engine.stats_text() if hasattr(self.engine, "stats_text") else ""
+        print(f"Translation via {result.source} {elapsed_ms:.0f}ms {stats}")
+        self._emit(data_map)
+
+    def fail(self, e):
+        if self.cancelled: return
+        self.log_signal.emit(self.ls.tr("err_trans_process").format(str(e)))
+        self.finished_signal.emit(self.req_id, self.text, self.ls.tr("err_general").format(str(e)))
+
+    def _emit(self, data_map):
+        osc_msg, disp_msg = self._render(data_map)
+        self.finished_signal.emit(self.req_id, osc_msg, disp_msg)
+
+    def _remember(self, requested, cache_key, data_map):
+        # 只缓存所有请求字段都齐全的结果，避免把半截失败的翻译固化下来
+        if self.memory is None: return
+        fields = {k: data_map.get(k) for k in requested}
+        if all(fields.values()):
+            self.memory.store(self.text, requested, cache_key, fields)
+
+    def _render(self, data_map):
+        """模板处理 (预编译模板，单次拼接)"""
+        self._fill_pinyin(data_map)
+        return self.templates.render(data_map)
+
+class BatchTranslationWorker(QRunnable):
+    """
+    微批处理：把排队中的多句合并为一次引擎调用 (LLM 为一次 JSON 数组请求)，
+    结果按原顺序交回各自的 TranslationWorker 渲染并发出 finished
+    """
+    def __init__(self, workers, engine):
+        super().__init__()
+        self.workers = workers
+        self.engine = engine
+        self.job = TranslationJob()
+        for w in workers:
+            w.job.on_cancel(self._on_item_cancel)
+
+    def _on_item_cancel(self):
+        # 所有句子都被取消时才关闭合并请求
+        if all(w.cancelled for w in self.workers):
+            self.job.cancel()
+
+    def run(self):
+        pending = []
+        for w in self.workers:
+            if w.cancelled: continue
+            try:
+                if w.prepare():
+                    pending.append(w)
+            except Exception as e:
+                w.fail(e)
+        if not pending or self.job.cancelled: return
 
-            api_key = self.cfg.get("api_key")
-            api_base = self.cfg.get("api_base")
-            model = self.cfg.get("model")
-
-            if api_key:
-                url = f"{api_base.rstrip('/')}/chat/completions"
-                headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-                payload = {
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": self.text}
-                    ],
-                    "response_format": {"type": "json_object"},
-                    "temperature": 0.3
-                }
-                
-                resp = requests.post(url, headers=headers, json=payload, timeout=10)
-                if resp.status_code == 200:
-                    try:
-                        content = resp.json()['choices'][0]['message']['content']
-                        parsed = json.loads(content)
-                        for k, v in parsed.items():
-                            if v: data_map[k] = v
-                    except Exception as e:
-                        self.log_signal.emit(f"JSON Parse Error: {e}")
-                else:
-                    self.log_signal.emit(self.ls.tr("err_api_code").format(resp.status_code))
-            else:
-                data_map["en"] = self.ls.tr("err_no_api_key")
-
-            # 模板处理
-            tpl_osc = self.cfg.get("tpl_osc")
-            tpl_disp = self.cfg.get("tpl_display")
-            
-            osc_msg = tpl_osc
-            for k, v in data_map.items():
-                osc_msg = osc_msg.replace(f"{{{k}}}", str(v))
-            osc_msg = osc_msg.replace("\\n", "\n")
-
-            final_lines = []
-            raw_lines = tpl_disp.split('\n')
-            for line in raw_lines:
-                temp_line = line
-                should_keep = True
-                for k in data_map.keys():
-                    placeholder = f"{{{k}}}"
-                    if placeholder in line:
-                        val = data_map[k]
-                        if not val and k != "text":
-                            should_keep = False
-                            break
-                        temp_line = temp_line.replace(placeholder, str(val))
-                if should_keep:
-                    final_lines.append(temp_line)
-
-            disp_msg = "\n".join(final_lines)
-            disp_msg = disp_msg.replace("\\n", "\n")
-            
-            self.finished_signal.emit(osc_msg, disp_msg)
-            
+        try:
+            t0 = time.perf_counter()
+            results = self.engine.translate_batch([w.text for w in pending], pending[0].requested, job=self.job)
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            for i, (w, result) in enumerate(zip(pending, results)):
+                if not result and not result.errors and not result.timed_out and not w.cancelled:
+                    w.log_signal.emit(w.ls.tr("log_trans_batch_missing").format(i + 1, len(pending)))
+                w.complete(result, elapsed_ms)
         except Exception as e:
-            self.log_signal.emit(self.ls.tr("err_trans_process").format(str(e)))
-            self.finished_signal.emit(self.text, self.ls.tr("err_general").format(str(e)))
+            for w in pending:
+                w.fail(e)
 
 class TranslationService(QObject):
     finished_signal = Signal(str, str) # osc_msg, display_msg
+    request_done = Signal(int, str, str) # req_id, osc_msg, display_msg
+    partial_signal = Signal(int, str, str, str) # req_id, lang, osc_msg, display_msg (流式：单个语言字段到达)
     log_signal = Signal(str)
+    # Worker -> Service 内部信号，经过序号过滤后再转发
+    _worker_done = Signal(int, str, str)
+    _worker_partial = Signal(int, str, str, str)
 
     def __init__(self, config_manager, lang_service):
         super().__init__()
-        self.client = udp_client.SimpleUDPClient("127.0.0.1", 9000)
+        self.osc_out = OscFanout(
+            config_manager.get("osc_targets"),
+            log_fn=lambda msg: self.log_signal.emit(self.ls.tr("err_osc_fail").format(msg)),
+        )
+        self.chatbox = ChatboxScheduler(config_manager, self._send_chatbox, self)
         self.cfg = config_manager
         self.ls = lang_service
         self.pool = QThreadPool.globalInstance()
+        self._next_id = 0
+        # 按请求顺序回传：尚未回传的请求 ID 与已完成、等待前面请求的结果
+        self._order = deque()
+        self._ready = {}  # req_id -> (osc_msg, disp_msg)
+        self._inflight = {}  # req_id -> TranslationWorker
+        # 微批处理：等待合并的请求
+        self._batch = []
+        self._batch_timer = QTimer(self)
+        self._batch_timer.setSingleShot(True)
+        self._batch_timer.timeout.connect(self._flush_batch)
+        self.http = PooledHttpClient(
+            pool_size=self.cfg.get("http_pool_size"),
+            http2=self.cfg.get("http2"),
+            idle_reconnect_sec=self.cfg.get("http_idle_reconnect_sec"),
+        )
+        self.latency = LatencyTracker()
+        self.usage = UsageStats()  # 本次会话的 token 用量与前缀缓存命中
+        self.memory = None
+        if self.cfg.get("trans_cache"):
+            self.memory = TranslationMemory(
+                capacity=self.cfg.get("trans_cache_size"),
+                fuzzy_threshold=self.cfg.get("trans_cache_fuzzy_threshold"),
+            )
+        self.trivial = TrivialInputClassifier() if self.cfg.get("trans_trivial_skip") else None
+        self.engine = None
+        self._engine_signature = None
+        self.load_engine()
+        if "pinyin" in compile_templates(self.cfg.get("tpl_osc"), self.cfg.get("tpl_display")).fields:
+            pinyin_service.warm_up()
+        self.request_done.connect(lambda _id, osc, disp: self.finished_signal.emit(osc, disp))
+        self._worker_done.connect(self._on_worker_done)
+        self._worker_partial.connect(self._on_worker_partial)
+
+    def process(self, text, speculative=False):
+        """
+        提交翻译请求，返回请求 ID (结果通过 request_done 按请求顺序回传：
+        较新的结果会等到更早的请求完成或被取消后再发出，旧结果不会覆盖新结果)
+        trans_supersede 开启时，新请求取消所有仍在进行的旧请求 (包括已发出的 HTTP 请求)；
+        trans_coalesce 开启时，其中仍在排队、尚未发出的原文并入新请求。
+        :param speculative: 投机翻译 (SpeculationTracker)，由其自行取消；既不取代其它请求，也不会被取代
+        """
+        self._next_id += 1
+        req_id = self._next_id
+
+        if self.cfg.get("trans_supersede") and not speculative:
+            queued = {w.req_id for w in self._batch}
+            merged = []
+            for old in list(self._inflight.values()):
+                if old.cancelled or old.speculative: continue
+                if old.req_id in queued and self.cfg.get("trans_coalesce"):
+                    merged.append(old.text)
+                self.cancel(old.req_id)
+            self._batch = [w for w in self._batch if not w.cancelled]
+            if merged:
+                text = " ".join(merged + [text])
+                self.log_signal.emit(self.ls.tr("log_trans_coalesced").format(len(merged) + 1))
 
-    def process(self, text):
         worker = TranslationWorker(
             text, self.cfg, self.ls,
-            {'finished': self.finished_signal, 'log': self.log_signal}
+            {'finished': self._worker_done, 'partial': self._worker_partial, 'log': self.log_signal},
+            req_id=req_id,
+            engine=self.engine,
+            memory=self.memory,
+            trivial=self.trivial
         )
-        self.pool.start(worker)
+        worker.speculative = speculative
+        # 仍有请求在进行时，新请求先进入微批窗口，与随后到达的几句合并为一次调用
+        window = self.cfg.get("trans_batch_window_ms")
+        busy = any(not w.cancelled for w in self._inflight.values()) or bool(self._batch)
+        self._inflight[req_id] = worker
+        self._order.append(req_id)
+        if window and window > 0 and busy:
+            self._batch.append(worker)
+            if len(self._batch) >= max(1, self.cfg.get("trans_batch_max")):
+                self._flush_batch()
+            elif not self._batch_timer.isActive():
+                self._batch_timer.start(window)
+        else:
+            self.pool.start(worker)
+        return req_id
 
-    def send_osc(self, text):
-        if not text: return
+    def _flush_batch(self):
+        self._batch_timer.stop()
+        workers = [w for w in self._batch if not w.cancelled]
+        self._batch = []
+        if not workers:
+            return
+        if len(workers) == 1:
+            self.pool.start(workers[0])
+            return
+        self.log_signal.emit(self.ls.tr("log_trans_batched").format(len(workers)))
+        batch = BatchTranslationWorker(workers, self.engine)
+        self.pool.start(batch)
+
+    def cancel(self, req_id):
+        """取消指定请求 (例如未命中的投机翻译、被取代的旧请求)，其结果不再回传"""
+        worker = self._inflight.pop(req_id, None)
+        if worker is not None:
+            worker.cancel()
         try:
-            self.client.send_message("/chatbox/input", [text, True, True])
-            if self.cfg.get("sound_cues"): winsound.Beep(1000, 100)
-            self.log_signal.emit(self.ls.tr("log_osc_sent"))
-        except Exception as e:
-            self.log_signal.emit(self.ls.tr("err_osc_fail").format(e))
\ No newline at end of file
+            self._order.remove(req_id)
+        except ValueError:
+            pass
+        self._ready.pop(req_id, None)
+        self._deliver()
+
+    def _on_worker_done(self, req_id, osc_msg, disp_msg):
+        self._inflight.pop(req_id, None)
+        if req_id not in self._order:
+            return  # 已取消
+        self._ready[req_id] = (osc_msg, disp_msg)
+        self._deliver()
+
+    def _deliver(self):
+        # 按提交顺序回传：队首请求尚未完成时，后面已完成的结果先暂存
+        while self._order and self._order[0] in self._ready:
+            req_id = self._order.popleft()
+            osc_msg, disp_msg = self._ready.pop(req_id)
+            self.request_done.emit(req_id, osc_msg, disp_msg)
+
+    def _on_worker_partial(self, req_id, lang, osc_msg, disp_msg):
+        if req_id not in self._order:
+            return
+        self.partial_signal.emit(req_id, lang, osc_msg, disp_msg)
+
+    def load_engine(self):
+        """按 trans_engine 创建翻译引擎 (设置保存后调用，引擎类型与本地模型参数都未变时不重建)；本地模型在后台线程加载"""
+        engine_type = self.cfg.get("trans_engine") or DEFAULT_ENGINE
+        signature = (engine_type,)
+        if engine_type != DEFAULT_ENGINE:
+            signature += tuple(self.cfg.get(k) for k in LOCAL_ENGINE_KEYS)
+        if self.engine is not None and signature == self._engine_signature:
+            return
+        self._engine_signature = signature
+
+        def _load():
+            engine = create_translation_engine(self.cfg, http=self.http, tracker=self.latency, usage=self.usage)
+            engine.initialize()
+            old, self.engine = self.engine, engine
+            if old is not None:
+                old.shutdown()
+
+        if engine_type == DEFAULT_ENGINE:
+            _load()  # 远程引擎的初始化只是后台预连接
+        else:
+            threading.Thread(target=_load, daemon=True).start()
+
+    def reload_osc_targets(self):
+        self.osc_out.configure(self.cfg.get("osc_targets"))
+
+    def warm_up(self, force=False):
+        """预连接 API (启动时 / 空闲后开始录音时调用)，让翻译请求直接复用连接"""
+        if self.engine is not None:
+            self.engine.warm_up(force)
+
+    def shutdown(self):
+        if self.engine is not None:
+            self.engine.shutdown()
+        self.http.close()
+        print(f"Chatbox: {self.chatbox.stats_text()}")
+        print(f"OSC targets: {self.osc_out.stats_text()}")
+        self.osc_out.close()
+        if self.trivial is not None:
+            print(f"Trivial input fast path: {self.trivial.stats_text()}")
+        if self.memory is not None:
+            print(f"Translation cache: {self.memory.stats_text()}")
+            self.memory.close()
+
+    def send_osc(self, text, notify=True):
+        """
+        交给 Chatbox 调度器排队发送 (限速 / 分页 / 合并)，其它目标立即发送
+        notify=False 用于流式中间结果：不播放提示音、不触发 VRChat 通知音
+        """
+        if not text: return
+        self.osc_out.send_message(text, notify)
+        if self.osc_out.chatbox_targets:
+            self.chatbox.submit(text, notify)
+        elif notify:
+            self._on_sent()
+
+    def _send_chatbox(self, text, notify):
+        # 编码在调用线程完成，实际发送在 OscFanout 的发送线程上，不会阻塞 UI
+        self.osc_out.send_chatbox(text, notify)
+        # 调度器只对一条消息真正发出的第一页传 notify=True；排队中被替换 / 丢弃的消息不会提示
+        if notify:
+            self._on_sent()
+
+    def _on_sent(self):
+        if self.cfg.get("sound_cues"): sound_cues.play("osc_sent")
+        self.log_signal.emit(self.ls.tr("log_osc_sent"))
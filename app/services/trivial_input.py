@@ -0,0 +1,100 @@
+# app/services/trivial_input.py
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from app.core.text_norm import normalize_text, guess_script_lang
+
+# 常见口头语 (归一化后的原文 -> 各语言固定译文)
+_LAUGH = {"zh": "哈哈哈", "en": "hahaha", "ja": "ははは", "ru": "ха-ха-ха"}
+STOP_PHRASES = {
+    "ok": {"zh": "好的", "en": "OK", "ja": "オーケー", "ru": "Окей"},
+    "okay": {"zh": "好的", "en": "Okay", "ja": "オーケー", "ru": "Окей"},
+    "好的": {"zh": "好的", "en": "OK", "ja": "いいよ", "ru": "Хорошо"},
+    "好": {"zh": "好", "en": "OK", "ja": "いいよ", "ru": "Хорошо"},
+    "嗯": {"zh": "嗯", "en": "Mm-hmm", "ja": "うん", "ru": "Угу"},
+    "嗯嗯": {"zh": "嗯嗯", "en": "Mm-hmm", "ja": "うんうん", "ru": "Угу"},
+    "对": {"zh": "对", "en": "Yes", "ja": "そう", "ru": "Да"},
+    "是的": {"zh": "是的", "en": "Yes", "ja": "はい", "ru": "Да"},
+    "yes": {"zh": "是的", "en": "Yes", "ja": "はい", "ru": "Да"},
+    "no": {"zh": "不", "en": "No", "ja": "いいえ", "ru": "Нет"},
+    "谢谢": {"zh": "谢谢", "en": "Thank you", "ja": "ありがとう", "ru": "Спасибо"},
+    "thanks": {"zh": "谢谢", "en": "Thanks", "ja": "ありがとう", "ru": "Спасибо"},
+    "thankyou": {"zh": "谢谢", "en": "Thank you", "ja": "ありがとう", "ru": "Спасибо"},
+    "你好": {"zh": "你好", "en": "Hello", "ja": "こんにちは", "ru": "Привет"},
+    "hello": {"zh": "你好", "en": "Hello", "ja": "こんにちは", "ru": "Привет"},
+    "hi": {"zh": "嗨", "en": "Hi", "ja": "やあ", "ru": "Привет"},
+    "再见": {"zh": "再见", "en": "Bye", "ja": "またね", "ru": "Пока"},
+    "拜拜": {"zh": "拜拜", "en": "Bye-bye", "ja": "バイバイ", "ru": "Пока"},
+    "bye": {"zh": "再见", "en": "Bye", "ja": "またね", "ru": "Пока"},
+    "晚安": {"zh": "晚安", "en": "Good night", "ja": "おやすみ", "ru": "Спокойной ночи"},
+    "lol": _LAUGH,
+    "lmao": _LAUGH,
+}
+# 单个 "草" / "笑" 是普通词语，只有叠字才算笑声
+_LAUGH_RE = re.compile(r"^(哈{2,}|呵{2,}|嘿{2,}|(ha){2,}h?|(he){2,}h?|w{3,}|草{2,}|笑{2,})$")
+
+# 判断纯 ASCII 拉丁文是否为英文：至少命中一个英文功能词
+# (刻意排除 a / in / on / so / was / will 等在法语 / 德语 / 西语中同样常见的拼写)
+_EN_WORDS = frozenset((
+    "the i i'm i'll you you're it it's is are am be been this that these those what who where when why how "
+    "and but or if to of for with from at my your our their me him her us them we they he she do does did "
+    "don't doesn't didn't not can can't could would should have has had there here just very really yeah"
+).split())
+_WORD_RE = re.compile(r"[a-z']+")
+
+REASON_NO_WORDS = "no_words"
+REASON_PHRASE = "phrase"
+REASON_TARGET = "already_target"
+
+
+def _looks_english(text):
+    return text.isascii() and any(w in _EN_WORDS for w in _WORD_RE.findall(text.lower()))
+
+
+class TrivialInputClassifier:
+    """
+    翻译前的快速判断：不值得调用 LLM 的输入直接在本地给出各语言字段
+    - 只有数字 / 标点 / 表情 (不含任何文字)：原样输出
+    - 常见口头语、笑声：查表
+    - 只启用一种目标语言且原文已经是该语言：原样输出
+    """
+
+    def __init__(self):
+        self.avoided = Counter()
+        self._lock = threading.Lock()
+
+    def classify(self, text, targets):
+        """返回 (fields, reason)；需要真正翻译时返回 (None, None)"""
+        stripped = text.strip()
+        if not stripped:
+            return None, None
+
+        script = guess_script_lang(stripped)
+        if not script and not any(unicodedata.category(ch).startswith("L") for ch in stripped):
+            return self._hit({k: stripped for k in targets}, REASON_NO_WORDS)
+
+        norm = normalize_text(stripped)
+        phrase = STOP_PHRASES.get(norm) or (_LAUGH if _LAUGH_RE.match(norm) else None)
+        if phrase is not None and all(k in phrase for k in targets):
+            return self._hit({k: phrase[k] for k in targets}, REASON_PHRASE)
+
+        # 拉丁字母只在纯 ASCII 且含有英文功能词时认定为英文，避免把 "Bonjour" 之类当成 "已经是英文"；
+        # 只有汉字的输入可能是日文 (如 "大丈夫")，不据此认定为中文
+        if len(targets) == 1 and script == targets[0] and script != "zh" and (script != "en" or _looks_english(stripped)):
+            return self._hit({targets[0]: stripped}, REASON_TARGET)
+        return None, None
+
+    def _hit(self, fields, reason):
+        with self._lock:
+            self.avoided[reason] += 1
+        return fields, reason
+
+    @property
+    def total_avoided(self):
+        return sum(self.avoided.values())
+
+    def stats_text(self):
+        detail = ", ".join(f"{k} {v}" for k, v in self.avoided.items())
+        return f"avoided {self.total_avoided} LLM calls ({detail or 'none'})"
@@ -12,6 +12,8 @@ from PySide6.QtCore import Qt, Signal, QSize, QEvent
 from PySide6.QtGui import QColor, QFont, QIcon, QCloseEvent
 
 from app.ui.theme import Theme
+from app.plugins.stt import available_engines
+from app.plugins.translation import available_engines as available_translation_engines
 from app.ui.components import (
     SettingCard, NavButton, StatusBadge, 
     NoScrollComboBox, NoScrollSpinBox, NoScrollSlider,
@@ -344,8 +346,8 @@ class MainWindow(QMainWindow):
         f_core.setHorizontalSpacing(20); f_core.setVerticalSpacing(15)
         
         self.combo_stt = NoScrollComboBox()
-        self.combo_stt.addItem("Faster-Whisper (Offline/Stable)", "faster_whisper")
-        self.combo_stt.addItem("FunASR (FunAudioLLM/High-Acc)", "funasr")
+        for spec in available_engines():
+            self.combo_stt.addItem(spec.label, spec.name)
         idx = self.combo_stt.findData(self.cfg.get("stt_engine"))
         self.combo_stt.setCurrentIndex(max(0, idx))
         self.combo_stt.currentIndexChanged.connect(self.mark_dirty)
@@ -437,6 +439,21 @@ class MainWindow(QMainWindow):
         
         for w in [self.input_api_base, self.input_api_key, self.input_model]: w.textChanged.connect(self.mark_dirty)
         
+        self.combo_trans = NoScrollComboBox()
+        for spec in available_translation_engines():
+            self.combo_trans.addItem(spec.label, spec.name)
+        idx_trans = self.combo_trans.findData(self.cfg.get("trans_engine"))
+        self.combo_trans.setCurrentIndex(max(0, idx_trans))
+        self.combo_trans.currentIndexChanged.connect(self.mark_dirty)
+
+        def update_api_visibility():
+            is_remote = self.combo_trans.currentData() == "llm_remote"
+            for w in [self.input_api_base, self.input_api_key, self.input_model]: w.setEnabled(is_remote)
+
+        self.combo_trans.currentIndexChanged.connect(update_api_visibility)
+        update_api_visibility()
+
+        f_api.addRow(self.ls.tr("lbl_trans_engine"), self.combo_trans)
         f_api.addRow("API Base:", self.input_api_base)
         f_api.addRow("API Key:", self.input_api_key)
         f_api.addRow("Model:", self.input_model)
@@ -497,8 +514,8 @@ class MainWindow(QMainWindow):
         self.btn_hk_rec = HotkeyButton(self.cfg.get("hotkey_rec"), self.ls.tr("btn_set_hotkey"))
         self.btn_hk_send = HotkeyButton(self.cfg.get("hotkey_send"), self.ls.tr("btn_set_hotkey"))
         
-        self.btn_hk_rec.key_changed.connect(lambda k: [self.cfg.set("hotkey_rec", k), self.mark_dirty()])
-        self.btn_hk_send.key_changed.connect(lambda k: [self.cfg.set("hotkey_send", k), self.mark_dirty()])
+        self.btn_hk_rec.key_changed.connect(lambda k: [self.cfg.set("hotkey_rec", k), self.logic.hotkey.reload(), self.mark_dirty()])
+        self.btn_hk_send.key_changed.connect(lambda k: [self.cfg.set("hotkey_send", k), self.logic.hotkey.reload(), self.mark_dirty()])
         
         self.rb_hold = QRadioButton(self.ls.tr("opt_hold"))
         self.rb_toggle = QRadioButton(self.ls.tr("opt_toggle"))
@@ -595,6 +612,7 @@ class MainWindow(QMainWindow):
         self.cfg.set("api_base", self.input_api_base.text().strip())
         self.cfg.set("api_key", self.input_api_key.text().strip())
         self.cfg.set("model", self.input_model.text().strip())
+        self.cfg.set("trans_engine", self.combo_trans.currentData())
         self.cfg.set("auto_send", self.chk_auto_send.isChecked())
         self.cfg.set("mic_index", self.combo_mic.currentData())
         self.cfg.set("rec_mode", "hold" if self.rb_hold.isChecked() else "toggle")
@@ -604,7 +622,7 @@ class MainWindow(QMainWindow):
         langs = {
             "zh": self.chk_zh.isChecked(), "en": self.chk_en.isChecked(),
             "ja": self.chk_ja.isChecked(), "ru": self.chk_ru.isChecked(),
-            "pinyin": True
+            "pinyin": (self.cfg.get("langs") or {}).get("pinyin", True)
         }
         self.cfg.set("langs", langs)
         self.cfg.set("tpl_display", self.txt_tpl_display.toPlainText())
@@ -11,10 +11,13 @@ from app.ui.main_window import MainWindow
 from app.services.dep_installer import FFmpegInstaller
 from app.services.audio_service import AudioService
 from app.services.hotkey_service import HotkeyService
+from app.services.osc_input import OscInputService
+from app.services import sound_cues
 from app.services.trans_service import TranslationService
 from app.config import ConfigManager
 from app.services.lang_service import LanguageService
 from app.vr import SteamVRService 
+from app.services.speculation import SpeculationTracker, SPEC_HIT
 
 class AppController:
     """
@@ -30,6 +33,7 @@ class AppController:
         self.ffmpeg = FFmpegInstaller()
         self.audio = AudioService(self.cfg, self.ls)
         self.hotkey = HotkeyService(self.cfg)
+        self.osc_input = OscInputService(self.cfg, self.ls)
         self.translator = TranslationService(self.cfg, self.ls)
         self.vr_service = SteamVRService()
         
@@ -38,6 +42,19 @@ class AppController:
         self._bind_signals()
 
         self.pending_osc = ""
+        # 双通道识别：预览文本的投机翻译
+        self.spec = SpeculationTracker(
+            self.translator,
+            min_stability=self.cfg.get("trans_spec_min_stability"),
+            min_chars=self.cfg.get("trans_spec_min_chars"),
+        )
+        self._active_req = 0
+        # 最终文本按说话顺序编号：较早一句的翻译不会覆盖较新一句已应用的结果
+        self._utterance = 0
+        self._req_utterance = {}  # req_id -> 所属最终文本的序号
+        self._applied_utterance = 0
+        # 低置信度 (门控标记) 的句子只翻译展示，不自动发送 OSC (按请求 ID 记录)
+        self._hold_reqs = set()
         self.ffmpeg.start()
 
     def _bind_signals(self):
@@ -48,6 +65,13 @@ class AppController:
         self.hotkey.req_stop_rec.connect(self.on_req_stop)
         self.hotkey.req_toggle_rec.connect(self.on_req_toggle)
         self.hotkey.req_send.connect(self.on_req_send)
+
+        # VRChat Avatar 参数 / 自定义 OSC 地址驱动录音
+        self.osc_input.req_start_rec.connect(self.on_req_start)
+        self.osc_input.req_stop_rec.connect(self.on_req_stop)
+        self.osc_input.req_toggle_rec.connect(self.on_req_toggle)
+        self.osc_input.req_send.connect(self.on_req_send)
+        self.osc_input.log_signal.connect(self.window.log)
         
         self.vr_service.req_toggle_rec.connect(self.on_req_toggle)
         self.vr_service.req_send.connect(self.on_req_send)
@@ -59,9 +83,12 @@ class AppController:
         # 以便同时分发给 Window 和 VR
         self.audio.status_signal.connect(self.on_status_changed)
         
+        self.audio.preview_signal.connect(self.on_audio_preview)
         self.audio.result_signal.connect(self.on_audio_result)
+        self.audio.flagged_signal.connect(self.on_audio_flagged)
         
-        self.translator.finished_signal.connect(self.on_translation_done)
+        self.translator.request_done.connect(self.on_translation_done)
+        self.translator.partial_signal.connect(self.on_translation_partial)
         self.translator.log_signal.connect(self.window.log)
 
     def on_ffmpeg_ready(self, success):
@@ -96,6 +123,9 @@ class AppController:
             pass
 
     def start_services(self):
+        self.osc_input.start()
+        if self.cfg.get("sound_cues"):
+            sound_cues.warm_up()
         if self.cfg.get("enable_steamvr"):
             self.window.log(self.ls.tr("log_vr_connecting"))
             self.vr_service.start()
@@ -115,6 +145,8 @@ class AppController:
             self.window.overlay.update_content(msg)
             self.vr_service.update_content(msg, "REC", True)
             self.audio.start_record()
+            # 说话期间提前建立 / 恢复到 API 的连接
+            self.translator.warm_up()
 
     def on_req_stop(self):
         if self.audio.is_recording: 
@@ -138,7 +170,19 @@ class AppController:
             self.window.overlay.update_content(formatted_osc)
             self.vr_service.update_content(formatted_osc, "SENT", False)
 
-    def on_audio_result(self, text):
+    def on_audio_preview(self, text, stability):
+        """小模型预览：立即展示，足够稳定时以预览文本提前开始翻译"""
+        preview_text = f"{self.ls.tr('status_preview')}\n{text}"
+        self.window.log(self.ls.tr("log_preview_result").format(text))
+        self.window.overlay.update_content(preview_text)
+        self.vr_service.update_content(preview_text, "PREVIEW", False)
+
+        self.spec.propose(text, stability)
+
+    def on_audio_flagged(self, text, reasons):
+        self.on_audio_result(text, hold_send=True)
+
+    def on_audio_result(self, text, hold_send=False):
         preview_text = f"{self.ls.tr('status_translating')}\n{text}"
         
         self.window.log(self.ls.tr("log_trans_result").format(text))
@@ -146,13 +190,64 @@ class AppController:
         self.vr_service.update_content(preview_text, "Transcribing...", False)
         
         self.window.set_status(self.ls.tr("status_translating"), "#f39c12")
-        self.translator.process(text)
 
-    def on_translation_done(self, osc_msg, disp_msg):
+        self._utterance += 1
+        spec_req = self.spec.pending_req
+        status, result = self.spec.resolve(text)
+        if status == SPEC_HIT:
+            # 最终文本与预览一致：沿用已经在进行 (或已完成) 的翻译
+            self.window.log(self.ls.tr("log_spec_hit"))
+            self._req_utterance[spec_req] = self._utterance
+            if hold_send:
+                self._hold_reqs.add(spec_req)
+            if result:
+                self._apply_translation(spec_req, *result)
+            return
+
+        # 不一致 (投机请求已取消) 或没有投机翻译：翻译最终文本
+        self._active_req = self.translator.process(text)
+        self._req_utterance[self._active_req] = self._utterance
+        if hold_send:
+            self._hold_reqs.add(self._active_req)
+
+    def on_translation_done(self, req_id, osc_msg, disp_msg):
+        if self.spec.is_spec(req_id):
+            # 最终文本尚未确认时 tracker 只暂存结果，避免把预览的翻译发送出去
+            if self.spec.on_done(req_id, osc_msg, disp_msg):
+                self._apply_translation(req_id, osc_msg, disp_msg)
+            return
+        # TranslationService 按请求顺序回传，较早的句子不会晚于当前句到达
+        self._apply_translation(req_id, osc_msg, disp_msg)
+
+    def on_translation_partial(self, req_id, lang, osc_msg, disp_msg):
+        """流式翻译：某个语言字段生成完毕，立即刷新悬浮窗 / VR 面板 (可选同步到 OSC)"""
+        is_spec = self.spec.is_spec(req_id)
+        if not is_spec and req_id != self._active_req:
+            return
+
+        self.window.overlay.update_content(disp_msg)
+        self.vr_service.update_content(disp_msg, f"+{lang.upper()}", False)
+
+        # 预览的投机翻译在最终文本确认前不外发
+        confirmed = not is_spec or self.spec.is_confirmed(req_id)
+        if confirmed and self.cfg.get("osc_stream_partial") and self.cfg.get("auto_send") and req_id not in self._hold_reqs:
+            self.translator.send_osc(osc_msg, notify=False)
+
+    def _apply_translation(self, req_id, osc_msg, disp_msg):
+        utterance = self._req_utterance.pop(req_id, self._utterance)
+        hold_send = req_id in self._hold_reqs
+        self._hold_reqs.discard(req_id)
+        if utterance < self._applied_utterance:
+            print(f"Dropping late translation of an earlier sentence (req {req_id})")
+            return
+        self._applied_utterance = utterance
+        # 被取代 / 取消的旧请求不会回传，顺带清理
+        self._req_utterance = {r: u for r, u in self._req_utterance.items() if u > utterance}
+        self._hold_reqs &= self._req_utterance.keys()
         self.pending_osc = osc_msg
         self.window.log(self.ls.tr("log_trans_complete"))
         
-        if self.cfg.get("auto_send"):
+        if self.cfg.get("auto_send") and not hold_send:
             self.translator.send_osc(osc_msg)
             self.window.set_status(self.ls.tr("status_auto_sent"), "#2ecc71")
             
@@ -168,6 +263,11 @@ class AppController:
 
     def on_settings_saved(self):
         threading.Thread(target=self.audio.reload, daemon=True).start()
+        self.translator.load_engine()
+        self.translator.reload_osc_targets()
+        self.osc_input.reload()
+        self.hotkey.reload()
+        self.translator.warm_up(force=True)
 
     def run(self):
         self.window.show()
@@ -175,7 +275,13 @@ class AppController:
         ret = self.app.exec()
         
         self.hotkey.stop()
+        self.osc_input.stop()
         self.vr_service.stop()
+        if self.spec.proposed:
+            print(f"Speculative translation: {self.spec.stats_text()}")
+        self.translator.shutdown()
+        sound_cues.shutdown()
+        self.cfg.flush()
         sys.exit(ret)
 
 if __name__ == "__main__":